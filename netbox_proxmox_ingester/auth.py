@@ -0,0 +1,397 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from collections.abc import Callable
+from http.cookies import SimpleCookie
+from pathlib import Path
+
+from proxmoxer import ProxmoxAPI, ProxmoxResource
+from proxmoxer.backends.https import (AuthenticationError, Backend,
+                                      ProxmoxHTTPAuth, ProxmoxHTTPAuthBase)
+
+import base64
+import functools
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Proxmox VE tickets are valid for two hours
+TICKET_LIFETIME = 7200
+
+# Cached tickets this close to expiry are discarded rather than used
+EXPIRY_MARGIN = 60
+
+_KDF_ITERATIONS = 390000
+
+
+def ticket_issued_at(ticket: str) -> float:
+    """
+    Get the time a Proxmox ticket was issued.
+
+    Tickets are in the form PVE:<user>:<hex timestamp>::<signature>.
+
+    Args:
+        ticket (str): The ticket to examine.
+
+    Returns:
+        float: The issue time as a UNIX timestamp, or now if unparseable.
+    """
+
+    try:
+        return float(int(ticket.split(':')[2], 16))
+    except (IndexError, ValueError):
+        return time.time()
+
+
+class TicketCache:
+    """
+    An encrypted-at-rest cache of Proxmox tickets, keyed on host and user.
+
+    The cache file is encrypted with a key derived from a passphrase, and is
+    locked while being read or written, so a single file can be shared by
+    every worker and every process in a run. Requires the 'cryptography'
+    package.
+    """
+
+    def __init__(self, path: str | Path, passphrase: str):
+        if Fernet is None:
+            raise ImportError('The ticket cache requires the cryptography ' \
+                              'package. Install netbox-proxmox-ingester[ticket-cache].')
+        if not passphrase:
+            raise ValueError('A passphrase is required for the ticket cache')
+
+        self.path = Path(path)
+        self._passphrase = passphrase.encode()
+        self._lock = threading.Lock()
+        # Deriving a key is deliberately slow, so it is only done once per salt
+        self._fernets: dict = {}
+
+    def _fernet(self, salt: bytes):
+        if salt not in self._fernets:
+            _key = hashlib.pbkdf2_hmac('sha256', self._passphrase, salt,
+                                       _KDF_ITERATIONS)
+            self._fernets[salt] = Fernet(base64.urlsafe_b64encode(_key))
+        return self._fernets[salt]
+
+    def _locked(self):
+        """Hold an exclusive lock on the cache file across processes"""
+
+        _lock_file = open(self.path.with_name(self.path.name + '.lock'), 'a')
+        if fcntl is not None:
+            fcntl.flock(_lock_file, fcntl.LOCK_EX)
+        return _lock_file
+
+    def _read(self) -> tuple:
+        """Read and decrypt the cache, returning (salt, tickets)"""
+
+        if not self.path.exists():
+            return (secrets.token_bytes(16), {})
+
+        try:
+            with open(self.path) as f:
+                _raw = json.load(f)
+            _salt = base64.b64decode(_raw['salt'])
+            _tickets = json.loads(self._fernet(_salt).decrypt(
+                _raw['tickets'].encode()))
+        except (ValueError, KeyError, InvalidToken):
+            print(f'Ticket cache {self.path} could not be decrypted, ignoring it')
+            return (secrets.token_bytes(16), {})
+
+        return (_salt, _tickets)
+
+    def _write(self, salt: bytes, tickets: dict):
+        """Encrypt and atomically replace the cache file"""
+
+        _payload = {
+            'version': 1,
+            'salt': base64.b64encode(salt).decode(),
+            'tickets': self._fernet(salt).encrypt(
+                json.dumps(tickets).encode()).decode(),
+        }
+
+        _temp = self.path.with_name(self.path.name + '.tmp')
+        _fd = os.open(_temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(_fd, 'w') as f:
+            json.dump(_payload, f)
+        os.replace(_temp, self.path)
+
+    @staticmethod
+    def _key(host: str, username: str) -> str:
+        return f'{host.lower()}/{username}'
+
+    def get(self, host: str, username: str) -> dict | None:
+        """
+        Get a cached ticket that is still usable.
+
+        Args:
+            host (str): The Proxmox host.
+            username (str): The Proxmox user, e.g. api@pve
+
+        Returns:
+            dict: The ticket, CSRF token and issue time, or None if there is
+                no ticket or it is about to expire.
+        """
+
+        with self._lock:
+            _lock_file = self._locked()
+            try:
+                _, _tickets = self._read()
+            finally:
+                _lock_file.close()
+
+        _entry = _tickets.get(self._key(host, username))
+        if _entry is None:
+            return None
+        if time.time() - _entry['issued'] >= TICKET_LIFETIME - EXPIRY_MARGIN:
+            return None
+
+        return _entry
+
+    def put(self, host: str, username: str, ticket: str, csrf_token: str):
+        """Store a ticket, dropping any expired tickets from the cache"""
+
+        with self._lock:
+            _lock_file = self._locked()
+            try:
+                _salt, _tickets = self._read()
+                _now = time.time()
+                _tickets = {key: entry for key, entry in _tickets.items()
+                            if _now - entry['issued'] < TICKET_LIFETIME}
+                _tickets[self._key(host, username)] = {
+                    'ticket': ticket,
+                    'csrf_token': csrf_token,
+                    'issued': ticket_issued_at(ticket),
+                }
+                self._write(_salt, _tickets)
+            finally:
+                _lock_file.close()
+
+    def discard(self, host: str, username: str):
+        """Remove the ticket of a host and user, e.g. after it was rejected"""
+
+        with self._lock:
+            _lock_file = self._locked()
+            try:
+                _salt, _tickets = self._read()
+                if _tickets.pop(self._key(host, username), None) is not None:
+                    self._write(_salt, _tickets)
+            finally:
+                _lock_file.close()
+
+
+class CachedTicketAuth(ProxmoxHTTPAuth):
+    """
+    Proxmox ticket authentication that reuses and refreshes cached tickets.
+
+    A usable cached ticket skips the login round-trip entirely. Tickets past
+    the renewal age are renewed with the ticket itself, so no password is
+    needed, and every new ticket is written back to the cache. The instance
+    is safe to share between worker threads.
+
+    The server may still reject a cached ticket, e.g. after a restart. If a
+    request fails with a 401 or a renewal fails, the ticket is dropped from
+    the cache, a password is obtained from password_prompt, and the request
+    is retried once with a new ticket.
+    """
+
+    def __init__(self, username: str, password: str | None = None,
+                 otp: str | None = None, base_url: str = '', host: str = '',
+                 ticket_cache: TicketCache | None = None,
+                 cached_ticket: dict | None = None,
+                 password_prompt: Callable[[], str] | None = None, **kwargs):
+        # The password login in ProxmoxHTTPAuth.__init__ is skipped on purpose
+        ProxmoxHTTPAuthBase.__init__(self, **kwargs)
+        self.base_url = base_url
+        self.username = username
+        self.host = host
+        self.ticket_cache = ticket_cache
+        self.password_prompt = password_prompt
+        self.pve_auth_ticket = ''
+        self._otp = otp
+        self._renew_lock = threading.Lock()
+
+        # Only read the cache if the caller has not already done so
+        _cached = cached_ticket
+        if _cached is None and ticket_cache is not None:
+            _cached = ticket_cache.get(host, username)
+
+        if _cached is not None:
+            self.pve_auth_ticket = _cached['ticket']
+            self.csrf_prevention_token = _cached['csrf_token']
+            # Age the ticket by the time since it was issued
+            self.birth_time = time.monotonic() - (time.time() - _cached['issued'])
+            if time.monotonic() - self.birth_time >= self.renew_age:
+                self._get_new_tokens()
+        elif password is not None:
+            self._get_new_tokens(password=password, otp=otp)
+        else:
+            self._password_login()
+
+    def _password_login(self):
+        """Log in with a password from password_prompt"""
+
+        if self.password_prompt is None:
+            raise AuthenticationError(f'No usable ticket for {self.username} on ' \
+                                      f'{self.host}, and no password was supplied')
+
+        self._get_new_tokens(password=self.password_prompt(), otp=self._otp)
+
+    def _discard_ticket(self):
+        """Forget the current ticket, here and in the cache"""
+
+        self.pve_auth_ticket = ''
+        if self.ticket_cache is not None:
+            self.ticket_cache.discard(host=self.host, username=self.username)
+
+    def _get_new_tokens(self, password=None, otp=None):
+        try:
+            super()._get_new_tokens(password=password, otp=otp)
+        except AuthenticationError:
+            if password is not None:
+                raise
+            # Renewing with the ticket itself failed, so the ticket is unusable
+            print(f'Proxmox ticket for {self.username} could not be renewed')
+            self._discard_ticket()
+            self._password_login()
+            return
+
+        if self.ticket_cache is not None:
+            self.ticket_cache.put(host=self.host,
+                                  username=self.username,
+                                  ticket=self.pve_auth_ticket,
+                                  csrf_token=self.csrf_prevention_token)
+
+    def _handle_401(self, response, ticket: str = '', **kwargs):
+        """Log in again and retry a request whose ticket was rejected"""
+
+        if response.status_code != 401:
+            return response
+
+        with self._renew_lock:
+            # Another worker may already have replaced the rejected ticket
+            if self.pve_auth_ticket == ticket:
+                print(f'Proxmox rejected the ticket for {self.username}, logging in again')
+                self._discard_ticket()
+                self._password_login()
+
+        # Consume the response, so the connection can be reused
+        response.content
+        response.close()
+
+        _request = response.request.copy()
+        _request.headers.pop('Cookie', None)
+        _request.prepare_cookies(self.get_cookies())
+        if 'CSRFPreventionToken' in _request.headers:
+            _request.headers['CSRFPreventionToken'] = self.csrf_prevention_token
+
+        _retry = response.connection.send(_request, **kwargs)
+        _retry.history.append(response)
+        _retry.request = _request
+
+        return _retry
+
+    def _sent_ticket(self, req) -> str:
+        """The ticket in the cookie of a prepared request"""
+
+        _cookie = SimpleCookie(req.headers.get('Cookie', ''))
+        _morsel = _cookie.get(self.service + 'AuthCookie')
+
+        return _morsel.value if _morsel else ''
+
+    def __call__(self, req):
+        # Only one worker renews an expiring ticket
+        with self._renew_lock:
+            req = super().__call__(req)
+
+            # The cookie is prepared before auth runs, so after a renewal, or
+            # one by another worker, it still holds the old ticket
+            if self._sent_ticket(req) != self.pve_auth_ticket:
+                req.headers.pop('Cookie', None)
+                req.prepare_cookies(self.get_cookies())
+            _ticket = self._sent_ticket(req)
+
+        req.register_hook('response', functools.partial(self._handle_401,
+                                                        ticket=_ticket))
+        return req
+
+
+def connect_proxmox(host: str, user: str, password: str | None = None,
+                    token_name: str = '', token_value: str = '',
+                    ticket_cache: TicketCache | None = None,
+                    cached_ticket: dict | None = None,
+                    password_prompt: Callable[[], str] | None = None,
+                    verify_ssl: bool = False):
+    """
+    Connect to the Proxmox API with the cheapest available authentication.
+
+    API tokens never need a login. Otherwise a usable ticket from the cache
+    is used, and only if there is none, or it is rejected, is the password
+    login performed.
+
+    Args:
+        host (str): The Proxmox host, optionally with a port.
+        user (str): The Proxmox user, e.g. api@pve
+        password (str): The password, only required without a cached ticket.
+        token_name (str): The API token ID, without the user prefix.
+        token_value (str): The API token secret.
+        ticket_cache (TicketCache): An optional shared ticket cache.
+        cached_ticket (dict): The ticket already read from the cache, if any,
+            to avoid reading and decrypting it again.
+        password_prompt: Called without arguments to get the password when
+            there is no usable ticket.
+        verify_ssl (bool): Verify the Proxmox TLS certificate.
+
+    Returns:
+        ProxmoxResource: The root resource of the Proxmox API.
+    """
+
+    if token_name:
+        return ProxmoxAPI(host, user=user, token_name=token_name,
+                          token_value=token_value, verify_ssl=verify_ssl)
+
+    # Let proxmoxer build the URL and session as usual. The placeholder token
+    # avoids its password login, and is replaced before any request is made.
+    _backend = Backend(host, user=user, token_name='', token_value='',
+                       verify_ssl=verify_ssl)
+    _backend.auth = CachedTicketAuth(username=user,
+                                     password=password,
+                                     base_url=_backend.get_base_url(),
+                                     host=host,
+                                     ticket_cache=ticket_cache,
+                                     cached_ticket=cached_ticket,
+                                     password_prompt=password_prompt,
+                                     verify_ssl=verify_ssl)
+
+    return ProxmoxResource(base_url=_backend.get_base_url(),
+                           session=_backend.get_session(),
+                           serializer=_backend.get_serializer())
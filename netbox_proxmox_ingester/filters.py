@@ -0,0 +1,150 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from dataclasses import dataclass, field
+
+import fnmatch
+
+
+def parse_vmid_range(value: str) -> tuple:
+    """
+    Parse a VM ID range such as 100-199, 100- or 100.
+
+    Args:
+        value (str): The range to parse.
+
+    Returns:
+        tuple: The (minimum, maximum) VM IDs. Either may be None if open.
+    """
+
+    lower, sep, upper = value.partition('-')
+    try:
+        vmid_min = int(lower) if lower else None
+        vmid_max = int(upper) if upper else None
+    except ValueError:
+        raise ValueError(f'Invalid VM ID range: {value}')
+
+    if not sep:
+        vmid_max = vmid_min
+    if vmid_min is not None and vmid_max is not None and vmid_min > vmid_max:
+        raise ValueError(f'Invalid VM ID range: {value}')
+
+    return (vmid_min, vmid_max)
+
+
+@dataclass
+class DiscoveryFilter:
+    """
+    Restrict discovery to a subset of nodes and VMs.
+
+    Every criterion can be checked against the VM listings returned by
+    Proxmox, so VMs are dropped before any per-VM config or agent call.
+    """
+
+    nodes: list = field(default_factory=list)
+    pool: str = ''
+    tags: list = field(default_factory=list)
+    vmid_min: int | None = None
+    vmid_max: int | None = None
+    name_glob: str = ''
+    running_only: bool = False
+    exclude_templates: bool = False
+
+    def has_vm_criteria(self) -> bool:
+        """Return True if any criteria apply to individual VMs"""
+        return any([self.tags, self.vmid_min is not None,
+                    self.vmid_max is not None, self.name_glob,
+                    self.running_only, self.exclude_templates])
+
+    def listing(self) -> str:
+        """
+        Choose the cheapest Proxmox VM listing for the filter.
+
+        Returns:
+            str: 'pool' for the member list of the pool, 'cluster' for a
+                single cluster-wide resource listing, or 'nodes' for the VM
+                list of each selected node.
+        """
+
+        if self.pool:
+            return 'pool'
+        if self.has_vm_criteria() and not self.nodes:
+            return 'cluster'
+
+        return 'nodes'
+
+    def match_node(self, node_name: str) -> bool:
+        """Check if a Proxmox node is selected"""
+        return not self.nodes or node_name in self.nodes
+
+    def match_vm(self, vm: dict) -> bool:
+        """
+        Check if a VM is selected.
+
+        Args:
+            vm (dict): A VM entry as listed by nodes/{node}/qemu,
+                cluster/resources or pools/{pool}.
+
+        Returns:
+            bool: True if the VM passes every filter.
+        """
+
+        vmid = int(vm['vmid'])
+
+        if self.vmid_min is not None and vmid < self.vmid_min:
+            return False
+        if self.vmid_max is not None and vmid > self.vmid_max:
+            return False
+        if self.running_only and vm.get('status') != 'running':
+            return False
+        if self.exclude_templates and int(vm.get('template', 0)) == 1:
+            return False
+        if self.name_glob and not fnmatch.fnmatchcase(vm.get('name', ''),
+                                                      self.name_glob):
+            return False
+        if self.tags:
+            # Proxmox returns tags as a single semicolon separated string
+            vm_tags = set(str(vm.get('tags', '')).replace(',', ';').split(';'))
+            if not vm_tags.intersection(self.tags):
+                return False
+
+        return True
+
+    def filter_vms(self, vms: list) -> list:
+        """Return only the selected VMs from a VM listing"""
+        return [vm for vm in vms if self.match_vm(vm)]
+
+
+def group_by_node(vms: list) -> dict:
+    """
+    Group a cluster-wide VM listing by node.
+
+    Args:
+        vms (list): VM entries, each including a 'node' key.
+
+    Returns:
+        dict: Node name mapped to the list of VMs on that node.
+    """
+
+    _grouped = {}
+    for vm in vms:
+        _grouped.setdefault(vm['node'], []).append(vm)
+
+    return _grouped
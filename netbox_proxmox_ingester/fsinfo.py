@@ -0,0 +1,248 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from .normalize import DISK_KEY_PATTERN
+
+# QEMU sets the disk serial to e.g. 0QEMU_QEMU_HARDDISK_drive-scsi0
+_SERIAL_PATTERN = re.compile(r'drive-([a-z]+\d+)$')
+
+
+def disk_key_from_serial(serial: str) -> str | None:
+    """
+    Get the Proxmox disk key from a guest disk serial.
+
+    Args:
+        serial (str): The serial reported by the guest agent.
+
+    Returns:
+        str: The disk key, e.g. scsi0, or None if the serial has none.
+    """
+
+    _match = _SERIAL_PATTERN.search(serial or '')
+    if _match is None:
+        return None
+
+    return _match.group(1)
+
+
+def disk_digest(vm_config: dict) -> str:
+    """
+    Digest the disk entries of a VM config.
+
+    Unlike the Proxmox config digest, this only changes when disks are added,
+    removed, moved or resized, and not on e.g. taking a snapshot.
+
+    Args:
+        vm_config (dict): The VM config, as returned by get_vm_config.
+
+    Returns:
+        str: A hex digest of the disk keys and values.
+    """
+
+    _disks = sorted((key, str(value)) for key, value in vm_config.items()
+                    if DISK_KEY_PATTERN.match(key))
+
+    return hashlib.sha1(json.dumps(_disks).encode()).hexdigest()
+
+
+def map_filesystems(fsinfo: list) -> dict:
+    """
+    Map guest filesystems to the virtual disks they live on.
+
+    Filesystems without a QEMU disk, such as snap loop devices, are ignored.
+    A filesystem mounted more than once is only counted once. The bytes of a
+    filesystem spanning several disks, e.g. on LVM or md RAID, are split
+    evenly across them, so the disks add up to the filesystem.
+
+    Args:
+        fsinfo (list): The result of the get-fsinfo agent command.
+
+    Returns:
+        dict: Disk key mapped to the used and total bytes of the disk, and
+            the filesystems it contains.
+    """
+
+    _disks = {}
+    _seen = set()
+
+    for filesystem in fsinfo:
+        if filesystem['name'] in _seen:
+            continue
+
+        # dict.fromkeys drops repeated disks while keeping their order
+        _keys = list(dict.fromkeys(
+            _key for disk in filesystem.get('disk', [])
+            if (_key := disk_key_from_serial(disk.get('serial', ''))) is not None))
+        if not _keys:
+            continue
+        _seen.add(filesystem['name'])
+
+        _used = divmod(int(filesystem.get('used-bytes', 0)), len(_keys))
+        _total = divmod(int(filesystem.get('total-bytes', 0)), len(_keys))
+
+        for index, key in enumerate(_keys):
+            # The first disk takes the remainder of the split
+            _disk_used = _used[0] + (_used[1] if index == 0 else 0)
+            _disk_total = _total[0] + (_total[1] if index == 0 else 0)
+
+            _disk = _disks.setdefault(key, {'used_bytes': 0,
+                                            'total_bytes': 0,
+                                            'filesystems': []})
+            _disk['used_bytes'] += _disk_used
+            _disk['total_bytes'] += _disk_total
+            _disk['filesystems'].append({
+                'name': filesystem['name'],
+                'mountpoint': filesystem.get('mountpoint', ''),
+                'type': filesystem.get('type', ''),
+                'used_bytes': _disk_used,
+                'total_bytes': _disk_total,
+                'disks': _keys,
+            })
+
+    return _disks
+
+
+class FsInfoCache:
+    """
+    A JSON file cache of mapped filesystems, keyed on node and VM ID.
+
+    An entry is only reused while the disk digest of the VM is unchanged,
+    i.e. no disks were added, removed or resized, and it is younger than
+    max_age. A cache file that cannot be read is ignored, and replaced on
+    save().
+    """
+
+    def __init__(self, path: str | Path, max_age: float = 3600):
+        self.path = Path(path)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries: dict = {}
+
+        try:
+            with open(self.path) as f:
+                self._entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f'Filesystem cache {self.path} could not be read, ignoring it: {e}')
+
+        if not isinstance(self._entries, dict):
+            self._entries = {}
+
+    @staticmethod
+    def _key(node: str, vmid: int) -> str:
+        return f'{node}/{vmid}'
+
+    def get(self, node: str, vmid: int, digest: str) -> dict | None:
+        """Get the cached filesystems of a VM, or None if stale or missing"""
+
+        with self._lock:
+            _entry = self._entries.get(self._key(node, vmid))
+
+        try:
+            if _entry is None or _entry['digest'] != digest:
+                return None
+            if time.time() - _entry['fetched_at'] >= self.max_age:
+                return None
+            return _entry['disks']
+        except (KeyError, TypeError):
+            return None
+
+    def put(self, node: str, vmid: int, digest: str, disks: dict):
+        """Store the filesystems of a VM"""
+
+        with self._lock:
+            self._entries[self._key(node, vmid)] = {
+                'digest': digest,
+                'fetched_at': time.time(),
+                'disks': disks,
+            }
+
+    def save(self):
+        """Write the cache to disk"""
+
+        _temp = self.path.with_name(self.path.name + '.tmp')
+
+        with self._lock:
+            with open(_temp, 'w') as f:
+                json.dump(self._entries, f)
+            os.replace(_temp, self.path)
+
+
+def collect_fsinfo(vms: list, fetch, cache: FsInfoCache | None = None,
+                   max_workers: int = 8) -> dict:
+    """
+    Collect and map the filesystems of many VMs concurrently.
+
+    Args:
+        vms (list): Dicts with the 'node', 'vmid' and 'digest' of each
+            agent-enabled VM, where the digest is its disk_digest.
+        fetch: Called as fetch(node_name, vm_id), returning the get-fsinfo
+            result of a VM.
+        cache (FsInfoCache): An optional cache, consulted before fetching.
+        max_workers (int): The number of concurrent agent requests.
+
+    Returns:
+        dict: VM ID mapped to its disks, as returned by map_filesystems.
+            VMs whose agent could not be queried are left out.
+    """
+
+    _results = {}
+    _pending = []
+
+    for vm in vms:
+        _cached = cache.get(vm['node'], vm['vmid'], vm['digest']) if cache else None
+        if _cached is not None:
+            _results[vm['vmid']] = _cached
+        else:
+            _pending.append(vm)
+
+    def _collect(vm: dict):
+        try:
+            _fsinfo = fetch(node_name=vm['node'], vm_id=vm['vmid'])
+        except Exception as e:
+            print(f'Error retrieving filesystems for VM {vm["vmid"]} ' \
+                  f'on node {vm["node"]}: {e}')
+            return vm, None
+        return vm, map_filesystems(_fsinfo)
+
+    if _pending:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for vm, disks in executor.map(_collect, _pending):
+                if disks is None:
+                    continue
+                _results[vm['vmid']] = disks
+                if cache is not None:
+                    cache.put(vm['node'], vm['vmid'], vm['digest'], disks)
+
+    print(f'Collected filesystems for {len(_results)} VMs, ' \
+          f'{len(vms) - len(_pending)} from cache')
+
+    return _results
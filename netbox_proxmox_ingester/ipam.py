@@ -0,0 +1,360 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from dataclasses import dataclass, field
+
+import ipaddress
+
+# The number of addresses looked up in NetBox per request
+LOOKUP_BATCH_SIZE = 100
+
+
+def is_local_address(address: str) -> bool:
+    """
+    Check if an address is link-local or loopback.
+
+    These are only meaningful on their own link or host, so they are never
+    placed in IPAM or checked for duplicates.
+
+    Args:
+        address (str): An address, with or without a mask.
+
+    Returns:
+        bool: True if the address is link-local or loopback.
+    """
+
+    ip = ipaddress.ip_interface(address).ip
+    return ip.is_link_local or ip.is_loopback
+
+
+@dataclass
+class PrefixEntry:
+    """A NetBox prefix as loaded into the resolver."""
+
+    prefix: str
+    netbox_id: int = 0
+    vrf_id: int | None = None
+    vrf_name: str = ''
+
+
+@dataclass
+class ExistingAddress:
+    """An IP address already in NetBox, and the object it is assigned to."""
+
+    netbox_id: int
+    assigned_object_type: str = ''
+    assigned_object_id: int | None = None
+    # The VM/interface name, if assigned to a VM interface
+    assigned_owner: str = ''
+
+    @property
+    def assigned_to(self) -> str:
+        """A readable name of the assigned object, or '' if unassigned."""
+        if self.assigned_object_id is None:
+            return ''
+        return self.assigned_owner or \
+            f'{self.assigned_object_type} {self.assigned_object_id}'
+
+
+@dataclass
+class ResolvedAddress:
+    """The result of resolving a single discovered address."""
+
+    address: str
+    prefix: PrefixEntry | None = None
+    existing: ExistingAddress | None = None
+    ambiguous: bool = False
+    mask_mismatch: bool = False
+
+    @property
+    def vrf_id(self) -> int | None:
+        """The VRF the address belongs in, or None for the global table."""
+        if self.prefix is None:
+            return None
+        return self.prefix.vrf_id
+
+    @property
+    def existing_id(self) -> int:
+        """The NetBox ID of the address, or 0 if it does not exist yet."""
+        if self.existing is None:
+            return 0
+        return self.existing.netbox_id
+
+
+@dataclass
+class AddressConflict:
+    """A problem found with a planned address before anything is written."""
+
+    address: str
+    reason: str
+    owners: list = field(default_factory=list)
+
+
+class _TrieNode:
+    """A single node in the binary prefix trie."""
+
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children: list = [None, None]
+        self.entries: list = []
+
+
+class PrefixTrie:
+    """
+    A binary radix trie of prefixes, keyed on the network bits.
+
+    IPv4 and IPv6 are kept in separate trees, so a lookup only ever walks at
+    most 32 or 128 levels regardless of how many prefixes are loaded.
+    """
+
+    def __init__(self):
+        self._roots = {4: _TrieNode(), 6: _TrieNode()}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def insert(self, entry: PrefixEntry):
+        """
+        Insert a prefix into the trie.
+
+        Args:
+            entry (PrefixEntry): The prefix to insert. More than one entry
+                may share a network, e.g. the same prefix in different VRFs.
+        """
+
+        network = ipaddress.ip_network(entry.prefix, strict=False)
+        node = self._roots[network.version]
+        bits = int(network.network_address)
+        width = network.max_prefixlen
+
+        for depth in range(network.prefixlen):
+            bit = (bits >> (width - 1 - depth)) & 1
+            if node.children[bit] is None:
+                node.children[bit] = _TrieNode()
+            node = node.children[bit]
+
+        node.entries.append(entry)
+        self._count += 1
+
+    def longest_match(self, address: str) -> list:
+        """
+        Find the most specific prefix(es) containing an address.
+
+        Args:
+            address (str): An address, with or without a mask.
+
+        Returns:
+            list: The PrefixEntry objects at the longest matching prefix, or
+                an empty list if nothing contains the address.
+        """
+
+        ip = ipaddress.ip_interface(address).ip
+        node = self._roots[ip.version]
+        bits = int(ip)
+        width = ip.max_prefixlen
+        best = node.entries
+
+        for depth in range(width):
+            node = node.children[(bits >> (width - 1 - depth)) & 1]
+            if node is None:
+                break
+            if node.entries:
+                best = node.entries
+
+        return best
+
+
+class IpamResolver:
+    """
+    Resolve discovered addresses against NetBox IPAM without a lookup per IP.
+
+    All prefixes, and the existing IP addresses matching the discovered
+    ones, are fetched from NetBox once by load(). Every subsequent resolve()
+    is answered from memory.
+    """
+
+    def __init__(self):
+        self.trie = PrefixTrie()
+        # ExistingAddress objects keyed on (vrf_id, host address)
+        self._existing: dict = {}
+
+    def load(self, netbox_api, addresses: list) -> bool:
+        """
+        Load all prefixes, and the existing IP addresses among those given.
+
+        Existing addresses are looked up in batches, so the cost scales with
+        the discovered addresses rather than the size of NetBox. The object
+        each one is assigned to is kept for find_conflicts().
+
+        Args:
+            netbox_api: A pynetbox API instance.
+            addresses (list): The discovered addresses in CIDR notation.
+                Link-local and loopback addresses are ignored.
+
+        Returns:
+            bool: True if the data was loaded, False on a connection error.
+        """
+
+        hosts = sorted({str(ipaddress.ip_interface(address).ip)
+                        for address in addresses
+                        if not is_local_address(address)})
+
+        try:
+            prefixes = list(netbox_api.ipam.prefixes.all())
+            existing = []
+            for start in range(0, len(hosts), LOOKUP_BATCH_SIZE):
+                existing.extend(netbox_api.ipam.ip_addresses.filter(
+                    address=hosts[start:start + LOOKUP_BATCH_SIZE]))
+        except ConnectionError as e:
+            print(f'Error connecting to NetBox API: {e}')
+            return False
+
+        for prefix in prefixes:
+            vrf = prefix.vrf
+            self.add_prefix(PrefixEntry(prefix=str(prefix.prefix),
+                                        netbox_id=prefix.id,
+                                        vrf_id=vrf.id if vrf else None,
+                                        vrf_name=vrf.name if vrf else ''))
+
+        for address in existing:
+            # Read the fields as returned, since pynetbox fetches the whole
+            # record again for any attribute left out of the response
+            _record = dict(address)
+            _vrf = _record.get('vrf') or {}
+            _assigned = _record.get('assigned_object') or {}
+            _owner = ''
+            if _assigned.get('virtual_machine') and _assigned.get('name'):
+                _owner = f'{_assigned["virtual_machine"]["name"]}/{_assigned["name"]}'
+            self.add_existing(address=str(_record['address']),
+                              netbox_id=_record['id'],
+                              vrf_id=_vrf.get('id'),
+                              assigned_object_type=_record.get('assigned_object_type') or '',
+                              assigned_object_id=_record.get('assigned_object_id'),
+                              assigned_owner=_owner)
+
+        print(f'Loaded {len(self.trie)} prefixes and {len(self._existing)} '
+              'IP addresses from NetBox')
+
+        return True
+
+    def add_prefix(self, entry: PrefixEntry):
+        """Add a single prefix to the resolver"""
+        self.trie.insert(entry)
+
+    def add_existing(self, address: str, netbox_id: int,
+                     vrf_id: int | None = None, assigned_object_type: str = '',
+                     assigned_object_id: int | None = None,
+                     assigned_owner: str = ''):
+        """Register an IP address that already exists in NetBox"""
+        key = (vrf_id, ipaddress.ip_interface(address).ip)
+        self._existing[key] = ExistingAddress(
+            netbox_id=netbox_id,
+            assigned_object_type=assigned_object_type,
+            assigned_object_id=assigned_object_id,
+            assigned_owner=assigned_owner)
+
+    def resolve(self, address: str) -> ResolvedAddress:
+        """
+        Resolve an address to its containing prefix and VRF.
+
+        Where the same prefix exists in more than one VRF, the global table
+        is preferred. If none of those VRFs is the global table, the result
+        is flagged as ambiguous.
+
+        Args:
+            address (str): The address in CIDR notation, e.g. 10.0.0.1/24
+
+        Returns:
+            ResolvedAddress: The resolved prefix, VRF and existing object ID.
+        """
+
+        interface = ipaddress.ip_interface(address)
+        result = ResolvedAddress(address=address)
+
+        matches = self.trie.longest_match(address)
+        if matches:
+            global_matches = [m for m in matches if m.vrf_id is None]
+            result.prefix = (global_matches or matches)[0]
+            result.ambiguous = len(matches) > 1 and not global_matches
+            prefix_len = ipaddress.ip_network(result.prefix.prefix,
+                                              strict=False).prefixlen
+            result.mask_mismatch = prefix_len != interface.network.prefixlen
+
+        result.existing = self._existing.get((result.vrf_id, interface.ip))
+
+        return result
+
+    def find_conflicts(self, vms: list) -> list:
+        """
+        Check every address in the data tree for conflicts before any writes.
+
+        An address is in conflict if it is discovered on more than one vNIC
+        within the same VRF, or if it already exists in NetBox assigned to
+        an object other than the vNIC it was discovered on. Addresses only
+        matching prefixes in more than one non-global VRF are also reported,
+        since they cannot be placed automatically. Link-local and loopback
+        addresses are skipped, since they are expected to repeat across VMs.
+
+        Args:
+            vms (list): The VMs from the data tree.
+
+        Returns:
+            list: A list of AddressConflict objects.
+        """
+
+        conflicts = []
+        seen: dict = {}
+
+        for vm in vms:
+            for vnic in vm.get('network', []):
+                owner = f'{vm["name"]}/{vnic["name"]}'
+                for ip in vnic['ips']:
+                    if is_local_address(ip['address']):
+                        continue
+
+                    resolved = self.resolve(ip['address'])
+                    if resolved.ambiguous:
+                        conflicts.append(AddressConflict(
+                            address=ip['address'],
+                            reason='prefix exists in more than one VRF',
+                            owners=[owner]))
+
+                    existing = resolved.existing
+                    if existing is not None and existing.assigned_to and \
+                            existing.assigned_owner != owner:
+                        conflicts.append(AddressConflict(
+                            address=ip['address'],
+                            reason=f'already assigned to {existing.assigned_to}',
+                            owners=[owner]))
+
+                    key = (resolved.vrf_id,
+                           ipaddress.ip_interface(ip['address']).ip)
+                    seen.setdefault(key, []).append(owner)
+
+        for (vrf_id, ip), owners in seen.items():
+            if len(owners) > 1:
+                conflicts.append(AddressConflict(
+                    address=str(ip),
+                    reason=f'duplicate address in VRF {vrf_id or "global"}',
+                    owners=owners))
+
+        return conflicts
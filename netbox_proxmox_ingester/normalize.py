@@ -0,0 +1,189 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from array import array
+from dataclasses import dataclass
+
+import re
+
+# Storage devices attached to a VM. unusedN volumes are detached, and
+# therefore not included.
+DISK_KEY_PATTERN = re.compile(r'^(ide|sata|scsi|virtio|efidisk|tpmstate)\d+$')
+
+_SIZE_PATTERN = re.compile(r'(?:^|,)size=(\d+(?:\.\d+)?)([KMGT]?)(?:,|$)')
+
+UNIT_BYTES = {
+    '': 1,
+    'K': 1024,
+    'M': 1024 ** 2,
+    'G': 1024 ** 3,
+    'T': 1024 ** 4,
+}
+
+MIB = 1024 ** 2
+
+# Proxmox defaults for VM config keys that are left unset
+DEFAULT_MEMORY_MB = 512
+DEFAULT_CORES = 1
+DEFAULT_SOCKETS = 1
+
+
+def parse_size(value: str) -> int | None:
+    """
+    Parse the size= option of a Proxmox drive string.
+
+    Args:
+        value (str): The drive string, e.g. local-lvm:vm-101-disk-0,size=500G
+
+    Returns:
+        int: The size in bytes, or None if there is no parseable size.
+    """
+
+    _match = _SIZE_PATTERN.search(str(value))
+    if _match is None:
+        return None
+
+    return int(float(_match.group(1)) * UNIT_BYTES[_match.group(2)])
+
+
+def is_cdrom(value: str) -> bool:
+    """Check if a Proxmox drive string is a CD-ROM rather than a disk"""
+    return 'media=cdrom' in str(value).split(',')
+
+
+@dataclass
+class NormalizationIssue:
+    """A config value that could not be parsed."""
+
+    row: int
+    vm_name: str
+    field: str
+    value: str
+
+
+class NormalizedInventory:
+    """
+    The size, memory and CPU fields of a whole inventory in columnar form.
+
+    VM columns have one entry per config, in the order the configs were
+    given. Disk columns have one entry per disk, grouped by VM, and
+    disk_offsets[row]:disk_offsets[row + 1] are the disks of a VM.
+    """
+
+    def __init__(self):
+        self.memory_mb = array('q')
+        self.cores = array('l')
+        self.sockets = array('l')
+        self.vcpus = array('l')
+
+        self.disk_offsets = array('l', [0])
+        self.disk_keys: list = []
+        self.disk_bytes = array('q')
+        self.disk_mb = array('q')
+
+    def __len__(self) -> int:
+        return len(self.memory_mb)
+
+    def disks_for(self, row: int) -> list:
+        """
+        Get the disks of a single VM.
+
+        Args:
+            row (int): The position of the VM config in the inventory.
+
+        Returns:
+            list: List of dicts, each mapping a disk key to its size in MB.
+        """
+
+        _start, _end = self.disk_offsets[row], self.disk_offsets[row + 1]
+        return [{self.disk_keys[i]: self.disk_mb[i]} for i in range(_start, _end)]
+
+
+def _parse_int(value, default: int, row: int, vm_name: str, field: str,
+               issues: list) -> int:
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        issues.append(NormalizationIssue(row=row, vm_name=vm_name,
+                                         field=field, value=str(value)))
+        return 0
+
+
+def normalize_inventory(configs: list) -> tuple:
+    """
+    Parse and convert the size, memory and CPU fields of many VM configs.
+
+    All fields are parsed in a single pass into compact arrays, and disk
+    sizes are then converted to NetBox units (MB, rounded up) in one batch.
+    Unparseable values are recorded as issues. Memory and CPU fields are
+    normalized to 0, and disks without a parseable size are left out.
+
+    Args:
+        configs (list): The VM configs, as returned by get_vm_config.
+
+    Returns:
+        tuple: The NormalizedInventory, and a list of NormalizationIssue.
+    """
+
+    inventory = NormalizedInventory()
+    issues = []
+
+    # Local references keep the per-config loop as tight as possible
+    _match_disk = DISK_KEY_PATTERN.match
+    _memory = inventory.memory_mb.append
+    _cores = inventory.cores.append
+    _sockets = inventory.sockets.append
+    _offsets = inventory.disk_offsets.append
+    _keys = inventory.disk_keys.append
+    _bytes = inventory.disk_bytes.append
+
+    for row, config in enumerate(configs):
+        _name = config.get('name', '')
+
+        _memory(_parse_int(config.get('memory'), DEFAULT_MEMORY_MB,
+                           row, _name, 'memory', issues))
+        _cores(_parse_int(config.get('cores'), DEFAULT_CORES,
+                          row, _name, 'cores', issues))
+        _sockets(_parse_int(config.get('sockets'), DEFAULT_SOCKETS,
+                            row, _name, 'sockets', issues))
+
+        for key, value in config.items():
+            if _match_disk(key) is None or is_cdrom(value):
+                continue
+
+            _size = parse_size(value)
+            if _size is None:
+                issues.append(NormalizationIssue(row=row, vm_name=_name,
+                                                 field=key, value=str(value)))
+                continue
+
+            _keys(key)
+            _bytes(_size)
+
+        _offsets(len(inventory.disk_keys))
+
+    # Convert to NetBox units across the whole inventory at once
+    inventory.vcpus = array('l', map(int.__mul__, inventory.cores,
+                                     inventory.sockets))
+    inventory.disk_mb = array('q', [-(-size // MIB) for size in inventory.disk_bytes])
+
+    return (inventory, issues)
@@ -0,0 +1,296 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from contextlib import nullcontext
+from pathlib import Path
+
+import cProfile
+import os
+import pstats
+import re
+import time
+import tracemalloc
+
+# Returned by every stage() call while profiling is disabled
+_NULL_STAGE = nullcontext()
+
+# Limits on the call graph expansion for collapsed stacks
+_MAX_STACK_DEPTH = 64
+_MIN_STACK_MICROSECONDS = 1
+
+
+def _label(func: tuple) -> str:
+    """A collapsed stack frame label for a pstats function key"""
+
+    _file, _line, _name = func
+    if _file == '~':
+        _label = _name
+    else:
+        _label = f'{_name} ({os.path.basename(_file)}:{_line})'
+
+    # ';' separates frames in the collapsed format
+    return _label.replace(';', ':')
+
+
+def collapsed_stacks(stats: pstats.Stats) -> list:
+    """
+    Derive collapsed stacks for flamegraph tools from profile statistics.
+
+    cProfile only records caller/callee pairs, so the time of a function is
+    split across its callers in proportion to the time each caller spent
+    in it. Recursive calls are not expanded.
+
+    Args:
+        stats (pstats.Stats): The profile statistics.
+
+    Returns:
+        list: Lines of 'frame;frame;frame microseconds'.
+    """
+
+    _callees: dict = {}
+    _roots = []
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller, (_, _, _, edge_ct) in callers.items():
+            _callees.setdefault(caller, []).append((func, edge_ct))
+        if not [caller for caller in callers if caller != func]:
+            _roots.append(func)
+
+    _lines = []
+
+    def _walk(func: tuple, stack: list, cumulative: float):
+        _, _, tt, ct, _ = stats.stats[func]
+        _ratio = cumulative / ct if ct else 0.0
+        _stack = stack + [_label(func)]
+
+        _self = int(tt * _ratio * 1e6)
+        if _self >= _MIN_STACK_MICROSECONDS:
+            _lines.append(f'{";".join(_stack)} {_self}')
+
+        if len(_stack) >= _MAX_STACK_DEPTH:
+            return
+        for callee, edge_ct in _callees.get(func, []):
+            if callee == func or _label(callee) in _stack:
+                continue
+            if edge_ct * _ratio * 1e6 >= _MIN_STACK_MICROSECONDS:
+                _walk(callee, _stack, edge_ct * _ratio)
+
+    for root in _roots:
+        _walk(root, [], stats.stats[root][3])
+
+    return _lines
+
+
+class _Stage:
+    """The profile, allocations and timings collected for one stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.profile = cProfile.Profile()
+        self.calls = 0
+        self.wall_time = 0.0
+        self.allocated = 0
+        # Allocation site mapped to [size difference, count difference],
+        # from the sampled entries only
+        self.allocations: dict = {}
+        self.sampled = 0
+
+
+class _StageContext:
+    """Context manager for entering a single stage."""
+
+    def __init__(self, profiler, stage: _Stage):
+        self._profiler = profiler
+        self._stage = stage
+
+    def __enter__(self):
+        self._profiler._enter(self._stage)
+        return self._stage
+
+    def __exit__(self, *exc):
+        self._profiler._exit(self._stage)
+
+
+class StageProfiler:
+    """
+    Per-stage cProfile and tracemalloc sessions.
+
+    Wrap each stage of a run in 'with profiler.stage(name):'. Entering the
+    same stage repeatedly accumulates into one report. When a stage is
+    entered inside another, the outer stage's profile is paused and its wall
+    time excludes the inner stage, so time is only counted once. Allocations
+    are measured from entry to exit, so they include those of any inner
+    stages.
+
+    Allocation sites need a tracemalloc snapshot on entry and exit, which is
+    costly for stages entered once per VM. Sites are therefore only sampled
+    from the first alloc_samples entries of each stage, while the total
+    allocated is measured on every entry.
+
+    Without an output directory the profiler is disabled, and stage()
+    returns a shared no-op context manager.
+    """
+
+    def __init__(self, output_dir: str | Path | None = None, top: int = 25,
+                 frames: int = 10, alloc_samples: int = 10):
+        self.enabled = bool(output_dir)
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.top = top
+        self.frames = frames
+        self.alloc_samples = alloc_samples
+
+        self._stages: dict = {}
+        self._active: list = []
+        self._snapshots: list = []
+        self._written = False
+
+    def stage(self, name: str):
+        """
+        Get a context manager profiling a stage.
+
+        Args:
+            name (str): The stage name, also used for the report file names.
+        """
+
+        if not self.enabled:
+            return _NULL_STAGE
+
+        if name not in self._stages:
+            self._stages[name] = _Stage(name)
+
+        return _StageContext(self, self._stages[name])
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+    def _enter(self, stage: _Stage):
+        _entered = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+        # Re-entering the running stage, e.g. through recursion, is a no-op
+        _outer = self._active[-1] if self._active else None
+        if _outer is not None and _outer is not stage:
+            _outer.profile.disable()
+
+        self._active.append(stage)
+        if _outer is stage:
+            self._snapshots.append(None)
+            return
+
+        stage.calls += 1
+        _snapshot = self._snapshot() if stage.sampled < self.alloc_samples else None
+        # Nested stage time, including their snapshots, accumulates in 'nested'
+        self._snapshots.append({'snapshot': _snapshot,
+                                'traced': tracemalloc.get_traced_memory()[0],
+                                'entered': _entered,
+                                'started': time.perf_counter(),
+                                'nested': 0.0})
+        stage.profile.enable()
+
+    def _exit(self, stage: _Stage):
+        self._active.pop()
+        _outer = self._active[-1] if self._active else None
+
+        _entry = self._snapshots.pop()
+        if _entry is None:
+            return
+
+        stage.profile.disable()
+        stage.wall_time += time.perf_counter() - _entry['started'] - _entry['nested']
+        stage.allocated += max(tracemalloc.get_traced_memory()[0] - _entry['traced'], 0)
+
+        if _entry['snapshot'] is not None:
+            stage.sampled += 1
+            for diff in self._snapshot().compare_to(_entry['snapshot'], 'traceback'):
+                if diff.size_diff <= 0:
+                    continue
+                _site = stage.allocations.setdefault(diff.traceback, [0, 0])
+                _site[0] += diff.size_diff
+                _site[1] += diff.count_diff
+
+        # Exclude this stage from the wall time of the stage it is nested in
+        for outer_entry in reversed(self._snapshots):
+            if outer_entry is not None:
+                outer_entry['nested'] += time.perf_counter() - _entry['entered']
+                break
+
+        if _outer is not None:
+            _outer.profile.enable()
+
+    def write_reports(self):
+        """
+        Write the reports of every stage to the output directory.
+
+        For each stage this writes the raw profile (.pstats), hot function
+        tables sorted by cumulative and own time (.txt), collapsed stacks
+        for flamegraph tools (.collapsed), and the top allocation sites
+        (.alloc.txt). A summary of all stages is written to summary.txt.
+
+        Only the first call writes anything, so this may be registered with
+        atexit and still be called explicitly.
+        """
+
+        if not self.enabled or self._written:
+            return
+        self._written = True
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        _summary = []
+
+        for stage in self._stages.values():
+            _base = self.output_dir / re.sub(r'[^\w.-]', '_', stage.name)
+
+            stage.profile.dump_stats(f'{_base}.pstats')
+
+            with open(f'{_base}.txt', 'w') as f:
+                _stats = pstats.Stats(stage.profile, stream=f)
+                _stats.strip_dirs()
+                for sort in ('cumulative', 'tottime'):
+                    f.write(f'=== Stage {stage.name}, sorted by {sort} ===\n')
+                    _stats.sort_stats(sort).print_stats(self.top)
+
+            with open(f'{_base}.collapsed', 'w') as f:
+                _lines = collapsed_stacks(pstats.Stats(stage.profile))
+                f.write('\n'.join(_lines) + '\n' if _lines else '')
+
+            _allocations = sorted(stage.allocations.items(),
+                                  key=lambda item: item[1][0], reverse=True)
+            with open(f'{_base}.alloc.txt', 'w') as f:
+                f.write(f'=== Stage {stage.name}, top {self.top} allocation sites, ' \
+                        f'sampled from {stage.sampled} of {stage.calls} entries ===\n')
+                for traceback, (size, count) in _allocations[:self.top]:
+                    f.write(f'\n{size / 1024:.1f} KiB in {count} blocks\n')
+                    for line in traceback.format(most_recent_first=True):
+                        f.write(f'{line}\n')
+
+            _summary.append(f'{stage.name}: {stage.calls} calls, ' \
+                            f'{stage.wall_time:.3f}s own wall time, ' \
+                            f'{stage.allocated / 1024:.1f} KiB net allocated')
+
+        with open(self.output_dir / 'summary.txt', 'w') as f:
+            f.write('\n'.join(_summary) + '\n')
+
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        print(f'Profiling reports for {len(self._stages)} stages written to {self.output_dir}')
@@ -0,0 +1,384 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+# Snapshot file layout, all integers little-endian:
+#
+#   header          see _HEADER below
+#   meta            compact JSON of the data tree, without the VMs
+#   payload         one compact JSON record per VM, back to back
+#   records         per VM: payload offset u64, length u32, vmid i64
+#   vmid index      open addressing hash table: vmid i64, row + 1 u32
+#   name index      open addressing hash table: name hash u64, row + 1 u32
+#
+# Each hash table has a power of two number of slots, at least twice the
+# number of VMs, and is probed linearly. A row of 0 marks an empty slot.
+
+from pathlib import Path
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import weakref
+import zlib
+
+MAGIC = b'NPXS'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHHI QI QQ QQ QI QI I')
+_RECORD = struct.Struct('<QIq')
+_VMID_SLOT = struct.Struct('<qI')
+_NAME_SLOT = struct.Struct('<QI')
+
+# VMs without a vmid, e.g. from older data trees, are not in the vmid index
+NO_VMID = -1
+
+_FNV_OFFSET = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+_MASK_64 = 0xffffffffffffffff
+_FIBONACCI = 0x9e3779b97f4a7c15
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is invalid"""
+
+
+def _name_hash(name: str) -> int:
+    """64-bit FNV-1a hash of a VM name, never 0"""
+
+    _hash = _FNV_OFFSET
+    for byte in name.encode():
+        _hash = ((_hash ^ byte) * _FNV_PRIME) & _MASK_64
+
+    return _hash or 1
+
+
+def _slot_count(records: int) -> int:
+    _slots = 1
+    while _slots < records * 2:
+        _slots *= 2
+    return _slots
+
+
+def _vmid_slot(vmid: int, mask: int) -> int:
+    return ((vmid * _FIBONACCI) & _MASK_64) >> 32 & mask
+
+
+def write_snapshot(path: str | Path, data_tree: dict):
+    """
+    Write a data tree to a snapshot file.
+
+    Args:
+        path (str | Path): The snapshot file to write. It is replaced
+            atomically, so readers never see a partial snapshot.
+        data_tree (dict): The data tree, with its VMs under 'vms'.
+    """
+
+    _vms = data_tree.get('vms', [])
+    _meta = json.dumps({key: value for key, value in data_tree.items()
+                        if key != 'vms'}, separators=(',', ':')).encode()
+
+    _payload = bytearray()
+    _records = bytearray()
+    _slots = _slot_count(len(_vms))
+    _vmid_index = bytearray(_VMID_SLOT.size * _slots)
+    _name_index = bytearray(_NAME_SLOT.size * _slots)
+    _mask = _slots - 1
+
+    for row, vm in enumerate(_vms):
+        _record = json.dumps(vm, separators=(',', ':')).encode()
+        _vmid = int(vm.get('vmid', NO_VMID))
+        _records += _RECORD.pack(len(_payload), len(_record), _vmid)
+        _payload += _record
+
+        if _vmid != NO_VMID:
+            _slot = _vmid_slot(_vmid, _mask)
+            while _VMID_SLOT.unpack_from(_vmid_index, _slot * _VMID_SLOT.size)[1]:
+                _slot = (_slot + 1) & _mask
+            _VMID_SLOT.pack_into(_vmid_index, _slot * _VMID_SLOT.size,
+                                 _vmid, row + 1)
+
+        _hash = _name_hash(vm.get('name', ''))
+        _slot = _hash & _mask
+        while _NAME_SLOT.unpack_from(_name_index, _slot * _NAME_SLOT.size)[1]:
+            _slot = (_slot + 1) & _mask
+        _NAME_SLOT.pack_into(_name_index, _slot * _NAME_SLOT.size, _hash, row + 1)
+
+    _meta_offset = _HEADER.size
+    _payload_offset = _meta_offset + len(_meta)
+    _records_offset = _payload_offset + len(_payload)
+    _vmid_offset = _records_offset + len(_records)
+    _name_offset = _vmid_offset + len(_vmid_index)
+
+    _header = _HEADER.pack(MAGIC, VERSION, 0, len(_vms),
+                           _meta_offset, len(_meta),
+                           _payload_offset, len(_payload),
+                           _records_offset, len(_records),
+                           _vmid_offset, _slots,
+                           _name_offset, _slots,
+                           zlib.crc32(_payload))
+
+    _path = Path(path)
+    _temp = _path.with_name(_path.name + '.tmp')
+    with open(_temp, 'wb') as f:
+        for block in (_header, _meta, _payload, _records, _vmid_index, _name_index):
+            f.write(block)
+    os.replace(_temp, _path)
+
+
+class SnapshotReader:
+    """
+    Memory-mapped, random access reader for a snapshot file.
+
+    Single VMs are looked up by vmid or name through the on-disk hash
+    indexes, without reading the rest of the file. Use as a context manager,
+    or call close() when done. Closing releases any record views still held,
+    see raw().
+    """
+
+    def __init__(self, path: str | Path, verify: bool = False):
+        self.path = Path(path)
+        # Record views handed out by raw(), keyed on id, until they are dropped
+        self._exported = weakref.WeakValueDictionary()
+        self._closed = False
+        self._file = open(self.path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SnapshotError(f'{self.path} is empty')
+        self._view = memoryview(self._mmap)
+
+        try:
+            self._read_header()
+            if verify:
+                self.verify()
+        except SnapshotError:
+            self.close()
+            raise
+
+    def _read_header(self):
+        if len(self._view) < _HEADER.size:
+            raise SnapshotError(f'{self.path} is too short to be a snapshot')
+
+        (_magic, _version, _flags, self._count,
+         self._meta_offset, self._meta_length,
+         self._payload_offset, self._payload_length,
+         self._records_offset, _records_length,
+         self._vmid_offset, self._vmid_slots,
+         self._name_offset, self._name_slots,
+         self._crc) = _HEADER.unpack_from(self._view, 0)
+
+        if _magic != MAGIC:
+            raise SnapshotError(f'{self.path} is not a snapshot')
+        if _version != VERSION:
+            raise SnapshotError(f'{self.path} is snapshot version {_version}, ' \
+                                f'only version {VERSION} is supported')
+        if self._name_offset + self._name_slots * _NAME_SLOT.size > len(self._view):
+            raise SnapshotError(f'{self.path} is truncated')
+
+    def verify(self):
+        """Check the payload checksum, raising SnapshotError on a mismatch"""
+        with self._view[self._payload_offset:
+                        self._payload_offset + self._payload_length] as _payload:
+            _crc = zlib.crc32(_payload)
+        if _crc != self._crc:
+            raise SnapshotError(f'{self.path} payload checksum mismatch')
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+
+        for view in list(self._exported.values()):
+            view.release()
+        self._exported.clear()
+        self._view.release()
+
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Views sliced from a record view still hold the mapping. It is
+            # unmapped once the last of them is dropped.
+            pass
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def meta(self) -> dict:
+        """The data tree without its VMs"""
+        return json.loads(bytes(self._view[self._meta_offset:
+                                           self._meta_offset + self._meta_length]))
+
+    def _record(self, row: int) -> tuple:
+        """The (offset, length, vmid) of a row in the record table"""
+        return _RECORD.unpack_from(self._view,
+                                   self._records_offset + row * _RECORD.size)
+
+    def _slice(self, row: int) -> memoryview:
+        _offset, _length, _ = self._record(row)
+        _start = self._payload_offset + _offset
+        return self._view[_start:_start + _length]
+
+    def raw(self, row: int) -> memoryview:
+        """
+        The encoded record of a row, as a view into the mapped file. The view
+        is released when the reader is closed, and must not be used after.
+        """
+        _view = self._slice(row)
+        self._exported[id(_view)] = _view
+        return _view
+
+    def vm(self, row: int) -> dict:
+        """Decode the VM at a row"""
+        with self._slice(row) as _view:
+            return json.loads(bytes(_view))
+
+    def get(self, vmid: int) -> dict | None:
+        """
+        Look up a single VM by vmid.
+
+        Args:
+            vmid (int): The Proxmox VM ID, as an int or a numeric string.
+
+        Returns:
+            dict: The VM, or None if it is not in the snapshot.
+        """
+
+        vmid = int(vmid)
+        _mask = self._vmid_slots - 1
+        _slot = _vmid_slot(vmid, _mask)
+        while True:
+            _vmid, _row = _VMID_SLOT.unpack_from(
+                self._view, self._vmid_offset + _slot * _VMID_SLOT.size)
+            if _row == 0:
+                return None
+            if _vmid == vmid:
+                return self.vm(_row - 1)
+            _slot = (_slot + 1) & _mask
+
+    def get_by_name(self, name: str) -> dict | None:
+        """
+        Look up a single VM by name. If more than one VM has the name, the
+        first written is returned.
+
+        Args:
+            name (str): The VM name.
+
+        Returns:
+            dict: The VM, or None if it is not in the snapshot.
+        """
+
+        _hash = _name_hash(name)
+        _mask = self._name_slots - 1
+        _slot = _hash & _mask
+        while True:
+            _slot_hash, _row = _NAME_SLOT.unpack_from(
+                self._view, self._name_offset + _slot * _NAME_SLOT.size)
+            if _row == 0:
+                return None
+            if _slot_hash == _hash:
+                _vm = self.vm(_row - 1)
+                if _vm.get('name') == name:
+                    return _vm
+            _slot = (_slot + 1) & _mask
+
+    def iter_raw(self):
+        """
+        Iterate over the encoded records without copying them. Each view is
+        released when the next one is produced, or when iteration stops, so
+        copy a record with bytes() to keep it.
+        """
+        for row in range(self._count):
+            with self._slice(row) as _view:
+                yield _view
+
+    def __iter__(self):
+        for row in range(self._count):
+            yield self.vm(row)
+
+    def to_tree(self) -> dict:
+        """Rebuild the full data tree"""
+        _tree = self.meta
+        _tree['vms'] = list(self)
+        return _tree
+
+
+def export_json(snapshot_path: str | Path, json_path: str | Path):
+    """Export a snapshot as a JSON data tree"""
+    with SnapshotReader(snapshot_path, verify=True) as reader:
+        _tree = reader.to_tree()
+
+    with open(json_path, 'w') as f:
+        json.dump(_tree, f, indent=2)
+
+
+def import_json(json_path: str | Path, snapshot_path: str | Path):
+    """Import a JSON data tree into a snapshot"""
+    with open(json_path) as f:
+        write_snapshot(snapshot_path, json.load(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='python -m netbox_proxmox_ingester.snapshot',
+        description='Convert and inspect data tree snapshots')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    _import = commands.add_parser('import', help='Convert a JSON data tree to a snapshot')
+    _import.add_argument('json_path')
+    _import.add_argument('snapshot_path')
+
+    _export = commands.add_parser('export', help='Convert a snapshot to a JSON data tree')
+    _export.add_argument('snapshot_path')
+    _export.add_argument('json_path')
+
+    _show = commands.add_parser('show', help='Show a single VM by vmid or name')
+    _show.add_argument('snapshot_path')
+    _show.add_argument('vm', help='The vmid or name of the VM')
+
+    args = parser.parse_args()
+
+    match args.command:
+        case 'import':
+            import_json(args.json_path, args.snapshot_path)
+        case 'export':
+            export_json(args.snapshot_path, args.json_path)
+        case 'show':
+            with SnapshotReader(args.snapshot_path) as reader:
+                _vm = reader.get(int(args.vm)) if args.vm.isdigit() else None
+                _vm = _vm or reader.get_by_name(args.vm)
+            if _vm is None:
+                parser.exit(1, f'VM {args.vm} not found\n')
+            print(json.dumps(_vm, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+# Local stand-in Proxmox VE and NetBox HTTP servers. These speak enough of
+# each API for the real ProxmoxAPI and pynetbox clients to be pointed at
+# them, with configurable latency, errors, pagination and rate limiting, so
+# that concurrency and throughput can be tested offline.
+
+from .common import FaultProfile
+from .netbox import NetBoxStandin
+from .proxmox import ProxmoxStandin
+
+__all__ = ['FaultProfile', 'NetBoxStandin', 'ProxmoxStandin']
@@ -0,0 +1,129 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from pathlib import Path
+
+import argparse
+import time
+
+from .common import DEFAULT_DATA_DIR, FaultProfile, LATENCY_DISTRIBUTIONS
+from .netbox import NetBoxStandin
+from .proxmox import ProxmoxStandin
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse the command line arguments"""
+
+    parser = argparse.ArgumentParser(
+        prog='python -m netbox_proxmox_ingester.standin',
+        description='Run stand-in Proxmox VE and NetBox APIs seeded from sample data')
+
+    parser.add_argument('--bind', default='127.0.0.1',
+                        help='Address to listen on')
+    parser.add_argument('--proxmox-port', type=int, default=8006,
+                        help='Proxmox VE stand-in port')
+    parser.add_argument('--netbox-port', type=int, default=8000,
+                        help='NetBox stand-in port')
+    parser.add_argument('--data-dir', type=Path, default=DEFAULT_DATA_DIR,
+                        help='Sample data directory to seed from')
+    parser.add_argument('--certfile', default='',
+                        help='TLS certificate for the Proxmox stand-in. ' \
+                        'ProxmoxAPI only connects over HTTPS.')
+    parser.add_argument('--keyfile', default='',
+                        help='TLS private key for the Proxmox stand-in')
+
+    # Inventory size
+    parser.add_argument('--vm-count', type=int, default=0,
+                        help='Clone the sample VMs up to this many VMs')
+    parser.add_argument('--node-count', type=int, default=1,
+                        help='Spread the VMs over this many nodes')
+    parser.add_argument('--page-size', type=int, default=50,
+                        help='Default NetBox page size')
+
+    # Fault injection, applied to both stand-ins
+    parser.add_argument('--latency', choices=LATENCY_DISTRIBUTIONS,
+                        default='fixed', help='Latency distribution')
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='Mean (or fixed) latency in milliseconds')
+    parser.add_argument('--jitter-ms', type=float, default=0.0,
+                        help='Half-width of uniform, or standard deviation ' \
+                        'of lognormal latency in milliseconds')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of requests failing with --error-status')
+    parser.add_argument('--error-status', type=int, default=500,
+                        help='HTTP status of injected errors')
+    parser.add_argument('--rate-limit', type=int, default=0,
+                        help='Requests per window before returning 429, 0 to disable')
+    parser.add_argument('--rate-window', type=float, default=1.0,
+                        help='Rate limit window in seconds')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Random seed for repeatable latency and errors')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Log every request')
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    def _profile() -> FaultProfile:
+        return FaultProfile(latency=args.latency,
+                            latency_ms=args.latency_ms,
+                            jitter_ms=args.jitter_ms,
+                            error_rate=args.error_rate,
+                            error_status=args.error_status,
+                            rate_limit=args.rate_limit,
+                            rate_window=args.rate_window,
+                            seed=args.seed)
+
+    proxmox = ProxmoxStandin(data_dir=args.data_dir,
+                             vm_count=args.vm_count,
+                             node_count=args.node_count,
+                             host=args.bind,
+                             port=args.proxmox_port,
+                             fault_profile=_profile(),
+                             certfile=args.certfile,
+                             keyfile=args.keyfile,
+                             verbose=args.verbose)
+    netbox = NetBoxStandin(data_dir=args.data_dir,
+                           vm_count=args.vm_count,
+                           page_size=args.page_size,
+                           host=args.bind,
+                           port=args.netbox_port,
+                           fault_profile=_profile(),
+                           verbose=args.verbose)
+
+    with proxmox, netbox:
+        print(f'Proxmox VE stand-in listening on {proxmox.url} ' \
+              f'with {len(proxmox.vms)} VMs on {len(proxmox.nodes)} nodes')
+        print(f'NetBox stand-in listening on {netbox.url}')
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+    for name, standin in (('Proxmox VE', proxmox), ('NetBox', netbox)):
+        print(f'{name} stand-in: {standin.stats.counters}')
+
+
+if __name__ == '__main__':
+    main()
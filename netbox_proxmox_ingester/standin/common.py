@@ -0,0 +1,404 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import ipaddress
+import json
+import math
+import random
+import ssl
+import threading
+import time
+
+# The sample data shipped in the repository root
+DEFAULT_DATA_DIR = Path(__file__).resolve().parents[2] / 'sample-data'
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+# Cloned VMs are numbered from here, and addressed from 10.0.0.0/8 in /24
+# networks of _CLONE_HOSTS VMs each
+CLONE_VMID_BASE = 1000
+CLONE_PREFIX_LENGTH = 24
+_CLONE_HOSTS = 250
+
+
+def clone_vmids(sample_count: int, vm_count: int) -> range:
+    """The VM IDs of the clones made to reach vm_count VMs"""
+    return range(CLONE_VMID_BASE + sample_count, CLONE_VMID_BASE + vm_count)
+
+
+def _clone_network(vmid: int) -> str:
+    _index = int(vmid) // _CLONE_HOSTS
+    return f'10.{(_index >> 8) & 255}.{_index & 255}'
+
+
+def clone_ipv4(vmid: int) -> str:
+    """The IPv4 address of a cloned VM, never a network or broadcast address"""
+    return f'{_clone_network(vmid)}.{int(vmid) % _CLONE_HOSTS + 1}'
+
+
+def clone_prefixes(vmids: range) -> list:
+    """The networks containing the IPv4 addresses of the given clones"""
+
+    _networks = []
+    for vmid in vmids:
+        _network = f'{_clone_network(vmid)}.0/{CLONE_PREFIX_LENGTH}'
+        if not _networks or _networks[-1] != _network:
+            _networks.append(_network)
+
+    return _networks
+
+
+def link_local_ipv6(mac: str) -> str:
+    """The EUI-64 IPv6 link-local address of a MAC"""
+
+    _octets = [int(octet, 16) for octet in mac.split(':')]
+    _octets[0] ^= 0x02
+    _eui = _octets[:3] + [0xff, 0xfe] + _octets[3:]
+    return str(ipaddress.IPv6Address(bytes([0xfe, 0x80] + [0] * 6 + _eui)))
+
+
+def load_sample(data_dir: Path, name: str):
+    """
+    Load a sample data file, stripping the Proxmox 'data' wrapper if present.
+
+    Args:
+        data_dir (Path): The sample data directory.
+        name (str): The file name, e.g. nodes.json
+
+    Returns:
+        The decoded sample data.
+    """
+
+    with open(Path(data_dir) / name) as f:
+        _raw = json.load(f)
+
+    if isinstance(_raw, dict) and list(_raw.keys()) == ['data']:
+        return _raw['data']
+
+    return _raw
+
+
+@dataclass
+class FaultProfile:
+    """
+    Latency, error and rate limiting behaviour of a stand-in server.
+
+    Latency is sampled per request from the chosen distribution, where
+    latency_ms is the mean (or fixed value). jitter_ms is the half-width of
+    the uniform distribution, and the standard deviation of the lognormal
+    one. The exponential distribution is fully defined by its mean.
+    Requests beyond rate_limit within rate_window seconds receive a 429
+    with a Retry-After header. A rate_limit of 0 disables rate limiting.
+    """
+
+    latency: str = 'fixed'
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    rate_limit: int = 0
+    rate_window: float = 1.0
+    retry_after: int = 1
+    seed: int | None = None
+
+    def __post_init__(self):
+        if self.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f'Unknown latency distribution: {self.latency}')
+        if not 0.0 <= self.error_rate <= 1.0:
+            raise ValueError(f'Error rate must be between 0 and 1: {self.error_rate}')
+
+        self._random = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+    def sample_latency(self) -> float:
+        """Return the latency for the next request in seconds"""
+
+        with self._lock:
+            match self.latency:
+                case 'fixed':
+                    _ms = self.latency_ms
+                case 'uniform':
+                    _ms = self._random.uniform(self.latency_ms - self.jitter_ms,
+                                               self.latency_ms + self.jitter_ms)
+                case 'exponential':
+                    _ms = self._random.expovariate(1 / self.latency_ms) \
+                        if self.latency_ms > 0 else 0.0
+                case 'lognormal':
+                    _ms = self._random.lognormvariate(*self._lognormal_params()) \
+                        if self.latency_ms > 0 else 0.0
+
+        return max(_ms, 0.0) / 1000
+
+    def _lognormal_params(self) -> tuple:
+        """The mu and sigma giving a mean of latency_ms and sd of jitter_ms"""
+        _sigma_squared = math.log1p((self.jitter_ms / self.latency_ms) ** 2)
+        return (math.log(self.latency_ms) - _sigma_squared / 2,
+                math.sqrt(_sigma_squared))
+
+    def should_fail(self) -> bool:
+        """Decide if the next request should fail with error_status"""
+
+        if self.error_rate == 0:
+            return False
+
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def should_throttle(self) -> bool:
+        """Count a request against the rate limit, True if it is exceeded"""
+
+        if self.rate_limit == 0:
+            return False
+
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.rate_window:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+
+            return self._window_count > self.rate_limit
+
+
+class StandinRequestHandler(BaseHTTPRequestHandler):
+    """
+    Base request handler applying the fault profile of its server.
+
+    Subclasses implement handle_api(method, path, query, body), returning a
+    (status, payload) tuple, or raise ApiError.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def send_json(self, status: int, payload, headers: dict | None = None):
+        """Send a JSON response"""
+
+        _body = b'' if payload is None else json.dumps(payload).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(_body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(_body)
+
+    def read_body(self):
+        """Read and decode a JSON or form encoded request body"""
+
+        _length = int(self.headers.get('Content-Length', 0))
+        if _length == 0:
+            return {}
+
+        _raw = self.rfile.read(_length).decode()
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            return json.loads(_raw)
+
+        return {key: values[-1] for key, values in parse_qs(_raw).items()}
+
+    def _dispatch(self, method: str):
+        stats = self.server.stats
+        profile = self.server.fault_profile
+        stats.count('requests')
+
+        # The body must always be consumed to keep the connection usable
+        try:
+            body = self.read_body()
+        except ValueError:
+            self.send_json(400, {'detail': 'Malformed request body'})
+            return
+
+        if profile.should_throttle():
+            stats.count('throttled')
+            self.send_json(429, {'detail': 'Request was throttled.'},
+                           headers={'Retry-After': str(profile.retry_after)})
+            return
+
+        _latency = profile.sample_latency()
+        if _latency:
+            time.sleep(_latency)
+
+        if profile.should_fail():
+            stats.count('errors')
+            self.send_json(profile.error_status,
+                           {'detail': 'Injected fault', 'data': None})
+            return
+
+        _url = urlsplit(self.path)
+        query = {key: values for key, values in parse_qs(_url.query).items()}
+
+        try:
+            status, payload = self.handle_api(method, _url.path, query, body)
+        except ApiError as e:
+            status, payload = e.status, {'detail': e.detail, 'data': None}
+
+        self.send_json(status, payload)
+
+    def handle_api(self, method: str, path: str, query: dict, body) -> tuple:
+        raise ApiError(404, 'Not found')
+
+
+class ApiError(Exception):
+    """An HTTP error returned by a stand-in server"""
+
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+class StandinStats:
+    """Thread safe request counters for a stand-in server"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: dict = {}
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def get(self, name: str) -> int:
+        return self.counters.get(name, 0)
+
+
+class _StandinHTTPServer(ThreadingHTTPServer):
+    """
+    A threaded HTTP server that does any TLS handshake in the request thread,
+    so a slow or idle client never holds up accepting other connections.
+    """
+
+    daemon_threads = True
+    ssl_context: ssl.SSLContext | None = None
+    handshake_timeout = 10
+
+    def finish_request(self, request, client_address):
+        if self.ssl_context is None:
+            return super().finish_request(request, client_address)
+
+        request.settimeout(self.handshake_timeout)
+        try:
+            _request = self.ssl_context.wrap_socket(request, server_side=True)
+        except (ssl.SSLError, OSError):
+            # The failed handshake has already closed the connection
+            return
+        _request.settimeout(None)
+
+        try:
+            super().finish_request(_request, client_address)
+        finally:
+            self.shutdown_request(_request)
+
+
+class StandinServer:
+    """
+    A threaded HTTP(S) server running a stand-in API in the background.
+
+    Pass certfile and keyfile to serve HTTPS, which is required by the
+    ProxmoxAPI client. A self-signed certificate is sufficient when the
+    client is created with verify_ssl=False.
+    """
+
+    handler_class = StandinRequestHandler
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 fault_profile: FaultProfile | None = None,
+                 certfile: str = '', keyfile: str = '',
+                 verbose: bool = False):
+        self.httpd = _StandinHTTPServer((host, port), self.handler_class)
+        self.httpd.fault_profile = fault_profile or FaultProfile()
+        self.httpd.stats = StandinStats()
+        self.httpd.verbose = verbose
+        self.httpd.standin = self
+        self.scheme = 'http'
+
+        if certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile=certfile, keyfile=keyfile or None)
+            self.httpd.ssl_context = context
+            self.scheme = 'https'
+
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        return self.httpd.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f'{self.scheme}://{self.host}:{self.port}'
+
+    @property
+    def stats(self) -> StandinStats:
+        return self.httpd.stats
+
+    @property
+    def fault_profile(self) -> FaultProfile:
+        return self.httpd.fault_profile
+
+    def start(self):
+        """Start serving in a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and close the socket"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,319 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from pathlib import Path
+from urllib.parse import urlencode
+
+import ipaddress
+import threading
+
+from .common import (ApiError, DEFAULT_DATA_DIR, StandinRequestHandler,
+                     StandinServer, clone_prefixes, clone_vmids, load_sample)
+
+NETBOX_VERSION = '4.2.0'
+
+# Collection path mapped to the fields required on create
+COLLECTIONS = {
+    'dcim/devices': ['name'],
+    'dcim/mac-addresses': ['mac_address'],
+    'virtualization/cluster-types': ['name', 'slug'],
+    'virtualization/clusters': ['name', 'type'],
+    'virtualization/virtual-machines': ['name'],
+    'virtualization/interfaces': ['virtual_machine', 'name'],
+    'virtualization/virtual-disks': ['virtual_machine', 'name', 'size'],
+    'ipam/vrfs': ['name'],
+    'ipam/prefixes': ['prefix'],
+    'ipam/ip-addresses': ['address'],
+}
+
+# Foreign key fields mapped to the collection they refer to
+FOREIGN_KEYS = {
+    'device': 'dcim/devices',
+    'primary_mac_address': 'dcim/mac-addresses',
+    'type': 'virtualization/cluster-types',
+    'cluster': 'virtualization/clusters',
+    'virtual_machine': 'virtualization/virtual-machines',
+    'vrf': 'ipam/vrfs',
+}
+
+# Generic foreign key types mapped to the collection they refer to
+ASSIGNED_OBJECT_TYPES = {
+    'virtualization.vminterface': 'virtualization/interfaces',
+}
+
+# Query parameters that control the listing rather than filter it
+_LISTING_PARAMS = {'limit', 'offset', 'brief', 'ordering', 'exclude', 'fields'}
+
+
+class NetBoxHandler(StandinRequestHandler):
+    """Request handler for the NetBox stand-in"""
+
+    def send_json(self, status: int, payload, headers: dict | None = None):
+        super().send_json(status, payload,
+                          headers=dict(headers or {},
+                                       **{'API-Version': NETBOX_VERSION[:3]}))
+
+    def handle_api(self, method: str, path: str, query: dict, body) -> tuple:
+        standin: NetBoxStandin = self.server.standin
+
+        if not standin.is_authenticated(self.headers):
+            raise ApiError(403, 'Invalid token')
+
+        parts = [part for part in path.split('/') if part]
+        if parts[:1] != ['api']:
+            raise ApiError(404, 'Not found')
+        parts = parts[1:]
+
+        if parts == ['status'] and method == 'GET':
+            return 200, {'netbox-version': NETBOX_VERSION, 'plugins': {}}
+        if parts == [] and method == 'GET':
+            return 200, {app: f'{standin.base_url(self.headers)}/api/{app}/'
+                         for app in ('dcim', 'ipam', 'virtualization')}
+
+        collection = '/'.join(parts[:2])
+        if collection not in COLLECTIONS:
+            raise ApiError(404, 'Not found')
+
+        base_url = standin.base_url(self.headers)
+
+        match (method, parts[2:]):
+            case ('GET', []):
+                return 200, standin.list(collection, query, path, base_url)
+            case ('POST', []):
+                if isinstance(body, list):
+                    return 201, [standin.create(collection, item, base_url)
+                                 for item in body]
+                return 201, standin.create(collection, body, base_url)
+            case ('GET', [object_id]):
+                return 200, standin.render(collection,
+                                           standin.get(collection, object_id),
+                                           base_url)
+            case ('PATCH' | 'PUT', [object_id]):
+                return 200, standin.update(collection, object_id, body, base_url)
+            case ('DELETE', [object_id]):
+                standin.delete(collection, object_id)
+                return 204, None
+
+        raise ApiError(405, f'Method "{method}" not allowed.')
+
+
+class NetBoxStandin(StandinServer):
+    """
+    A stand-in for the parts of the NetBox REST API used by the ingester.
+
+    Each collection is an in-memory store supporting exact match filters,
+    limit/offset pagination with absolute 'next' links, and create, update
+    and delete. Proxmox nodes from the sample data are seeded as devices,
+    and the networks of the sample agent addresses are seeded as prefixes.
+    With vm_count set, the networks of the VMs cloned by a ProxmoxStandin
+    with the same vm_count are seeded too.
+
+    If token is set, requests must carry it in the Authorization header.
+    """
+
+    handler_class = NetBoxHandler
+
+    def __init__(self, data_dir: Path = DEFAULT_DATA_DIR, token: str = '',
+                 page_size: int = 50, max_page_size: int = 1000,
+                 seed: bool = True, vm_count: int = 0, **kwargs):
+        super().__init__(**kwargs)
+
+        self.token = token
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+
+        self._lock = threading.Lock()
+        self._store: dict = {collection: {} for collection in COLLECTIONS}
+        self._next_id: dict = {collection: 1 for collection in COLLECTIONS}
+
+        if seed:
+            self._seed(Path(data_dir), vm_count=vm_count)
+
+    def _seed(self, data_dir: Path, vm_count: int = 0):
+        """Seed devices and prefixes from the sample data"""
+
+        for node in load_sample(data_dir, 'nodes.json'):
+            self.add('dcim/devices', {'name': node['node'], 'status': 'active'})
+
+        _networks = []
+        for nic in load_sample(data_dir, 'vm_network_interfaces.json')['result']:
+            for ip in nic.get('ip-addresses', []):
+                _network = ipaddress.ip_interface(
+                    f'{ip["ip-address"]}/{ip["prefix"]}').network
+                if _network.is_loopback or _network.is_link_local:
+                    continue
+                if _network not in _networks:
+                    _networks.append(_network)
+
+        _clones = clone_vmids(len(load_sample(data_dir, 'node_vms.json')), vm_count)
+        _networks.extend(ipaddress.ip_network(prefix)
+                         for prefix in clone_prefixes(_clones))
+
+        for network in _networks:
+            self.add('ipam/prefixes', {'prefix': str(network), 'vrf': None,
+                                       'status': 'active'})
+
+    def is_authenticated(self, headers) -> bool:
+        """Check the API token of a request"""
+        if not self.token:
+            return True
+        _scheme, _, _token = headers.get('Authorization', '').partition(' ')
+        return _scheme in ('Token', 'Bearer') and _token == self.token
+
+    def base_url(self, headers) -> str:
+        """The URL clients reached this server on, for absolute links"""
+        return f'{self.scheme}://{headers.get("Host", f"{self.host}:{self.port}")}'
+
+    # === Store ===
+
+    def add(self, collection: str, record: dict) -> dict:
+        """Add a record to a collection without validation, returning it"""
+
+        with self._lock:
+            _record = dict(record, id=self._next_id[collection])
+            self._next_id[collection] += 1
+            self._store[collection][_record['id']] = _record
+
+        return _record
+
+    def get(self, collection: str, object_id) -> dict:
+        try:
+            return self._store[collection][int(object_id)]
+        except (KeyError, ValueError):
+            raise ApiError(404, 'No object matches the given query.')
+
+    def create(self, collection: str, body: dict, base_url: str) -> dict:
+        """Validate and create a record"""
+
+        _missing = [name for name in COLLECTIONS[collection]
+                    if body.get(name) in (None, '')]
+        if _missing:
+            raise ApiError(400, f'Missing required fields: {", ".join(_missing)}')
+
+        return self.render(collection, self.add(collection, body), base_url)
+
+    def update(self, collection: str, object_id, body: dict, base_url: str) -> dict:
+        _record = self.get(collection, object_id)
+        with self._lock:
+            _record.update({key: value for key, value in body.items()
+                            if key != 'id'})
+        return self.render(collection, _record, base_url)
+
+    def delete(self, collection: str, object_id):
+        self.get(collection, object_id)
+        with self._lock:
+            self._store[collection].pop(int(object_id), None)
+
+    def list(self, collection: str, query: dict, path: str, base_url: str) -> dict:
+        """Filter and paginate a collection"""
+
+        with self._lock:
+            _records = list(self._store[collection].values())
+
+        _filters = {key: values for key, values in query.items()
+                    if key not in _LISTING_PARAMS}
+        _records = [record for record in _records
+                    if all(self._match(record, key, values)
+                           for key, values in _filters.items())]
+
+        try:
+            limit = int(query.get('limit', [self.page_size])[0])
+            offset = int(query.get('offset', [0])[0])
+        except ValueError:
+            raise ApiError(400, 'Invalid limit or offset')
+        if limit <= 0 or limit > self.max_page_size:
+            limit = self.max_page_size
+
+        def _page_url(page_offset: int) -> str:
+            _query = dict(_filters, limit=[str(limit)], offset=[str(page_offset)])
+            return f'{base_url}{path}?{urlencode(_query, doseq=True)}'
+
+        _page = _records[offset:offset + limit]
+        return {
+            'count': len(_records),
+            'next': _page_url(offset + limit) if offset + limit < len(_records) else None,
+            'previous': _page_url(max(offset - limit, 0)) if offset > 0 else None,
+            'results': [self.render(collection, record, base_url)
+                        for record in _page],
+        }
+
+    @staticmethod
+    def _match(record: dict, key: str, values: list) -> bool:
+        """Check a record against one filter, where any value may match"""
+
+        # Foreign keys are filtered on <field>_id
+        if key.endswith('_id') and key[:-3] in FOREIGN_KEYS:
+            key = key[:-3]
+
+        _value = record.get(key)
+        for value in values:
+            if value == 'null' and _value is None:
+                return True
+            match key:
+                case 'address':
+                    # NetBox matches addresses on the host, ignoring the mask
+                    try:
+                        if _value and ipaddress.ip_interface(_value).ip == \
+                                ipaddress.ip_interface(value).ip:
+                            return True
+                    except ValueError:
+                        pass
+                case 'mac_address':
+                    if str(_value).lower() == value.lower():
+                        return True
+                case _:
+                    if str(_value) == value:
+                        return True
+
+        return False
+
+    def render(self, collection: str, record: dict, base_url: str) -> dict:
+        """Render a record as the API returns it, with nested foreign keys"""
+
+        _rendered = dict(record)
+        _rendered['url'] = f'{base_url}/api/{collection}/{record["id"]}/'
+        _rendered['display'] = str(record.get('name') or record.get('address')
+                                   or record.get('prefix')
+                                   or record.get('mac_address') or record['id'])
+
+        for key, target in FOREIGN_KEYS.items():
+            _value = record.get(key)
+            if isinstance(_value, dict):
+                _value = _value.get('id')
+            if _value is None or key not in record:
+                continue
+            _nested = {'id': int(_value),
+                       'url': f'{base_url}/api/{target}/{_value}/'}
+            _target = self._store[target].get(int(_value), {})
+            if 'name' in _target:
+                _nested['name'] = _target['name']
+            _nested['display'] = str(_target.get('name', _value))
+            _rendered[key] = _nested
+
+        # The object an IP address is assigned to, e.g. a VM interface
+        _collection = ASSIGNED_OBJECT_TYPES.get(record.get('assigned_object_type'))
+        _assigned = record.get('assigned_object_id')
+        if _collection and _assigned is not None:
+            _target = self._store[_collection].get(int(_assigned))
+            if _target is not None:
+                _rendered['assigned_object'] = self.render(_collection, _target,
+                                                           base_url)
+
+        return _rendered
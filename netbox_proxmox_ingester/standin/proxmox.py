@@ -0,0 +1,331 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from http.cookies import SimpleCookie
+from pathlib import Path
+
+import copy
+import hashlib
+import re
+import secrets
+import threading
+import time
+
+from .common import (ApiError, DEFAULT_DATA_DIR, StandinRequestHandler,
+                     StandinServer, clone_ipv4, clone_vmids, link_local_ipv6,
+                     load_sample)
+
+_API_PREFIX = '/api2/json'
+
+_MAC_PATTERN = re.compile(r'=([0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5})')
+
+
+class ProxmoxHandler(StandinRequestHandler):
+    """Request handler for the Proxmox VE stand-in"""
+
+    def handle_api(self, method: str, path: str, query: dict, body) -> tuple:
+        standin: ProxmoxStandin = self.server.standin
+
+        if not path.startswith(_API_PREFIX):
+            raise ApiError(404, 'Not found')
+        parts = [part for part in path[len(_API_PREFIX):].split('/') if part]
+
+        if parts == ['access', 'ticket'] and method == 'POST':
+            return 200, {'data': standin.login(username=body.get('username', ''),
+                                               password=body.get('password', ''))}
+
+        if not standin.is_authenticated(headers=self.headers, method=method):
+            raise ApiError(401, 'No ticket')
+
+        return 200, {'data': standin.route(method, parts, query)}
+
+
+class ProxmoxStandin(StandinServer):
+    """
+    A stand-in for the parts of the Proxmox VE API used by the ingester.
+
+    The inventory is seeded from the sample data. Setting vm_count and
+    node_count clones the sample VMs across additional nodes, each with a
+    unique VM ID, name, MAC, IPv4 and link-local IPv6 address, for load
+    testing. A NetBoxStandin with the same vm_count seeds the prefixes of
+    the cloned IPv4 addresses.
+
+    Tickets issued by access/ticket are accepted as credentials, and may be
+    renewed by logging in again with the ticket as the password. API tokens
+    are accepted if they are listed in api_tokens, in the form
+    'user@realm!name=secret'.
+    """
+
+    handler_class = ProxmoxHandler
+
+    ticket_lifetime = 7200
+
+    def __init__(self, data_dir: Path = DEFAULT_DATA_DIR, vm_count: int = 0,
+                 node_count: int = 1, password: str = '',
+                 api_tokens: list | None = None, **kwargs):
+        super().__init__(**kwargs)
+
+        self.password = password
+        self.api_tokens = set(api_tokens or [])
+        self._tickets: dict = {}
+        self._lock = threading.Lock()
+
+        self._load(data_dir=Path(data_dir), vm_count=vm_count,
+                   node_count=max(node_count, 1))
+
+    # === Inventory ===
+
+    def _load(self, data_dir: Path, vm_count: int, node_count: int):
+        """Build the inventory from the sample data"""
+
+        self.cluster_status = load_sample(data_dir, 'clusters.json')
+        _sample_nodes = load_sample(data_dir, 'nodes.json')
+        _sample_vms = load_sample(data_dir, 'node_vms.json')
+        self._config_template = load_sample(data_dir, 'vm_config.json')
+        self._fsinfo = load_sample(data_dir, 'vm_fsinfo.json')
+        self._network = load_sample(data_dir, 'vm_network_interfaces.json')
+
+        # Add any additional nodes as copies of the first sample node
+        self.nodes = list(_sample_nodes)
+        _status_node = next(item for item in self.cluster_status
+                            if item['type'] == 'node')
+        for i in range(len(self.nodes), node_count):
+            _node = dict(_sample_nodes[0])
+            _node['node'] = f'{_sample_nodes[0]["node"]}{i + 1}'
+            _node['id'] = f'node/{_node["node"]}'
+            self.nodes.append(_node)
+            self.cluster_status.append(dict(_status_node, name=_node['node'],
+                                            id=_node['id'], nodeid=i + 1,
+                                            local=0))
+
+        for item in self.cluster_status:
+            if item['type'] == 'cluster':
+                item['nodes'] = len(self.nodes)
+
+        # VMs are keyed on vmid, and remember the node they live on
+        self.vms: dict = {}
+        for vm in _sample_vms:
+            self.add_vm(node=self.nodes[0]['node'], vm=vm)
+
+        for i, vmid in enumerate(clone_vmids(len(_sample_vms), vm_count),
+                                 start=len(_sample_vms)):
+            _vm = dict(_sample_vms[i % len(_sample_vms)])
+            _vm['vmid'] = vmid
+            _vm['name'] = f'{_vm["name"]}-{i}'
+            self.add_vm(node=self.nodes[i % node_count]['node'], vm=_vm)
+
+    def add_vm(self, node: str, vm: dict, config: dict | None = None,
+               pool: str = '', tags: str = ''):
+        """
+        Add a VM to the inventory.
+
+        Args:
+            node (str): The node the VM lives on.
+            vm (dict): The VM entry as listed by nodes/{node}/qemu.
+            config (dict): The VM config. Generated from the sample config
+                if not given.
+            pool (str): The resource pool the VM is a member of.
+            tags (str): Semicolon separated VM tags.
+        """
+
+        _vm = dict(vm)
+        if tags:
+            _vm['tags'] = tags
+
+        self.vms[int(_vm['vmid'])] = {
+            'node': node,
+            'pool': pool,
+            'vm': _vm,
+            'config': config or self._make_config(_vm),
+        }
+
+    def _make_config(self, vm: dict) -> dict:
+        """Generate a VM config from the sample config"""
+
+        _config = copy.deepcopy(self._config_template)
+
+        # The sample VM keeps its sample config untouched
+        if _config['name'] == vm['name']:
+            return _config
+
+        _config['name'] = vm['name']
+        _config['memory'] = int(vm.get('maxmem', 0)) // (1024 * 1024)
+        _config['cores'] = int(vm.get('cpus', 1))
+        _config['sockets'] = 1
+        _config['net0'] = _MAC_PATTERN.sub(f'={self._vm_mac(vm["vmid"])}',
+                                           _config['net0'], count=1)
+        _config['digest'] = hashlib.sha1(
+            f'{vm["vmid"]}-{vm["name"]}'.encode()).hexdigest()
+
+        # The agent can only ever respond on a running VM
+        if vm.get('status') != 'running':
+            _config.pop('agent', None)
+
+        return _config
+
+    @staticmethod
+    def _vm_mac(vmid: int) -> str:
+        """Generate a stable, locally administered MAC for a VM"""
+        _octets = int(vmid).to_bytes(4, 'big')
+        return '02:00:' + ':'.join(f'{octet:02X}' for octet in _octets)
+
+    def _get_vm(self, node: str, vmid: str) -> dict:
+        _entry = self.vms.get(int(vmid))
+        if _entry is None or _entry['node'] != node:
+            raise ApiError(500, f'Configuration file for VM {vmid} does not exist')
+        return _entry
+
+    def _agent_network(self, entry: dict) -> dict:
+        """The agent network response, rewritten for the VM's own MAC"""
+
+        _network = copy.deepcopy(self._network)
+        _sample_mac = _MAC_PATTERN.search(self._config_template['net0']).group(1)
+        _vm_mac = _MAC_PATTERN.search(entry['config']['net0']).group(1)
+        if _vm_mac == _sample_mac:
+            return _network
+
+        _vmid = int(entry['vm']['vmid'])
+        for nic in _network['result']:
+            if nic['hardware-address'] != _sample_mac.lower():
+                continue
+            nic['hardware-address'] = _vm_mac.lower()
+            for ip in nic.get('ip-addresses', []):
+                if ip['ip-address-type'] == 'ipv4':
+                    ip['ip-address'] = clone_ipv4(_vmid)
+                elif ip['ip-address'].lower().startswith('fe80:'):
+                    ip['ip-address'] = link_local_ipv6(_vm_mac)
+
+        return _network
+
+    # === Authentication ===
+
+    def login(self, username: str, password: str) -> dict:
+        """Issue a new ticket for a password or an existing valid ticket"""
+
+        self.stats.count('logins')
+
+        if not username or not password:
+            raise ApiError(401, 'authentication failure')
+        if self.password and password != self.password \
+                and not self._ticket_valid(password):
+            raise ApiError(401, 'authentication failure')
+
+        _issued = int(time.time())
+        _ticket = f'PVE:{username}:{_issued:08X}::{secrets.token_urlsafe(24)}'
+        with self._lock:
+            self._tickets[_ticket] = _issued
+
+        return {
+            'username': username,
+            'ticket': _ticket,
+            'CSRFPreventionToken': f'{_issued:08X}:{secrets.token_urlsafe(16)}',
+        }
+
+    def _ticket_valid(self, ticket: str) -> bool:
+        with self._lock:
+            _issued = self._tickets.get(ticket)
+        return _issued is not None and time.time() - _issued < self.ticket_lifetime
+
+    def is_authenticated(self, headers, method: str) -> bool:
+        """Check the ticket cookie or API token of a request"""
+
+        _authorization = headers.get('Authorization', '')
+        if _authorization.startswith('PVEAPIToken='):
+            _token = _authorization[len('PVEAPIToken='):]
+            return not self.api_tokens or _token in self.api_tokens
+
+        _cookie = SimpleCookie(headers.get('Cookie', ''))
+        if 'PVEAuthCookie' not in _cookie:
+            return False
+        if method != 'GET' and not headers.get('CSRFPreventionToken'):
+            return False
+
+        return self._ticket_valid(_cookie['PVEAuthCookie'].value)
+
+    # === Routing ===
+
+    def route(self, method: str, parts: list, query: dict):
+        """Return the response data for an authenticated API call"""
+
+        if method != 'GET':
+            raise ApiError(501, f'Method {method} not implemented')
+
+        match parts:
+            case ['cluster', 'status']:
+                return self.cluster_status
+            case ['cluster', 'resources']:
+                return self._cluster_resources(query.get('type', [''])[0])
+            case ['nodes']:
+                return self.nodes
+            case ['pools', pool]:
+                return self._pool(pool)
+            case ['nodes', node, 'qemu']:
+                return [entry['vm'] for entry in self.vms.values()
+                        if entry['node'] == node]
+            case ['nodes', node, 'qemu', vmid, 'config']:
+                return self._get_vm(node, vmid)['config']
+            case ['nodes', node, 'qemu', vmid, 'agent', command]:
+                return self._agent(self._get_vm(node, vmid), command)
+
+        raise ApiError(501, f'Method \'GET /{"/".join(parts)}\' not implemented')
+
+    def _resource(self, entry: dict) -> dict:
+        _vm = entry['vm']
+        _resource = {
+            'id': f'qemu/{_vm["vmid"]}',
+            'type': 'qemu',
+            'node': entry['node'],
+            'vmid': _vm['vmid'],
+            'name': _vm['name'],
+            'status': _vm['status'],
+            'template': int(_vm.get('template', 0)),
+        }
+        if entry['pool']:
+            _resource['pool'] = entry['pool']
+        if _vm.get('tags'):
+            _resource['tags'] = _vm['tags']
+        return _resource
+
+    def _cluster_resources(self, resource_type: str) -> list:
+        _resources = []
+        if resource_type in ('', 'node'):
+            _resources += [dict(node, type='node') for node in self.nodes]
+        if resource_type in ('', 'vm'):
+            _resources += [self._resource(entry) for entry in self.vms.values()]
+        return _resources
+
+    def _pool(self, pool: str) -> dict:
+        _members = [self._resource(entry) for entry in self.vms.values()
+                    if entry['pool'] == pool]
+        if not _members:
+            raise ApiError(500, f'pool \'{pool}\' does not exist')
+        return {'poolid': pool, 'members': _members}
+
+    def _agent(self, entry: dict, command: str) -> dict:
+        if 'agent' not in entry['config'] or entry['vm'].get('status') != 'running':
+            raise ApiError(500, 'QEMU guest agent is not running')
+
+        match command:
+            case 'get-fsinfo':
+                return copy.deepcopy(self._fsinfo)
+            case 'network-get-interfaces':
+                return self._agent_network(entry)
+
+        raise ApiError(501, f'Agent command {command} not implemented')
@@ -18,14 +18,23 @@ limitations under the License.
 SPDX-License-Identifier: Apache-2.0
 """
 
-from proxmoxer import ProxmoxAPI
-
 import pynetbox
 
+from netbox_proxmox_ingester.auth import TicketCache, connect_proxmox
+from netbox_proxmox_ingester.ipam import IpamResolver, is_local_address
+from netbox_proxmox_ingester.normalize import normalize_inventory
+from netbox_proxmox_ingester.profiling import StageProfiler
+from netbox_proxmox_ingester.snapshot import write_snapshot
+from netbox_proxmox_ingester.filters import DiscoveryFilter, group_by_node, parse_vmid_range
+from netbox_proxmox_ingester.fsinfo import FsInfoCache, collect_fsinfo, disk_digest
+
 from enum import Enum
 
+import argparse
+import atexit
 import json
 import getpass
+import os
 
 # === Global values and defaults start here ===
 
@@ -38,6 +47,7 @@ netbox_host: str = 'https://dev.netbox.hbnet.co.za'
 # these values at runtime anyways.
 
 proxmox_password: str = ''
+proxmox_token_value: str = ''
 netbox_api_token: str = ''
 # Very important to note that these values are not set here for security 
 # reasons. The user will be prompted for these values at runtime in this 
@@ -68,13 +78,83 @@ netbox_api = pynetbox.api(url='localhost', token='000')
 
 netbox_version = ()
 
+# Loaded once per ingestion, and used to place every IP Address
+ipam_resolver = IpamResolver()
+
+# Default is to discover every VM on every node
+discovery_filter = DiscoveryFilter()
+
+# Default is to log in with a password on every run
+ticket_cache = None
+cached_ticket = None
+
+# Default is to not profile anything
+profiler = StageProfiler()
+
 # === Global values and defaults end here ===
 
 # === Helper methods start here ===
 
+def parse_arguments() -> argparse.Namespace:
+    """Parse the command line arguments"""
+
+    parser = argparse.ArgumentParser(
+        description='Ingest Proxmox VE virtual machines into NetBox')
+
+    # Discovery filters. All of these are applied before any per-VM requests
+    parser.add_argument('--node', action='append', default=[],
+                        help='Only discover VMs on this node. May be repeated.')
+    parser.add_argument('--pool', default='',
+                        help='Only discover VMs in this resource pool')
+    parser.add_argument('--tag', action='append', default=[],
+                        help='Only discover VMs with this tag. May be repeated.')
+    parser.add_argument('--vmid', type=parse_vmid_range, default=(None, None),
+                        help='Only discover VM IDs in this range, e.g. 100-199')
+    parser.add_argument('--name', default='',
+                        help='Only discover VMs with names matching this glob')
+    parser.add_argument('--running-only', action='store_true',
+                        help='Only discover running VMs')
+    parser.add_argument('--exclude-templates', action='store_true',
+                        help='Do not discover VM templates')
+
+    # Proxmox authentication
+    parser.add_argument('--token-name', default='',
+                        help='Authenticate with this Proxmox API token ID ' \
+                        'instead of a password. The secret is read from ' \
+                        'PROXMOX_TOKEN_VALUE, or prompted for.')
+    parser.add_argument('--ticket-cache', default='',
+                        help='Reuse Proxmox tickets from this encrypted cache ' \
+                        'file. The passphrase is read from ' \
+                        'PROXMOX_TICKET_CACHE_KEY, or prompted for.')
+
+    # Guest filesystem inventory
+    parser.add_argument('--fsinfo', action='store_true',
+                        help='Collect guest filesystem usage per virtual disk ' \
+                        'from the agent of each running VM')
+    parser.add_argument('--fsinfo-cache', default='',
+                        help='Cache filesystem usage in this file, and only ' \
+                        'refetch it when the VM disks change')
+    parser.add_argument('--fsinfo-max-age', type=int, default=3600,
+                        help='Refetch cached filesystem usage older than this ' \
+                        'many seconds')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='Number of concurrent agent requests')
+
+    # Audit trail
+    parser.add_argument('--snapshot', default='',
+                        help='Write the discovered data tree to this snapshot file')
+
+    # Diagnostics
+    parser.add_argument('--profile', default='',
+                        help='Profile each stage of the run, and write the ' \
+                        'reports to this directory')
+
+    return parser.parse_args()
+
 def get_proxmox_overrides():
     """Get the default override values from the user"""
-    global proxmox_host, proxmox_username, proxmox_password, vm_pin_method
+    global proxmox_host, proxmox_username, proxmox_password, proxmox_token_value
+    global vm_pin_method, ticket_cache, cached_ticket
 
     proxmox_host_input = input(f'Proxmox host [{proxmox_host}]: ')
     if proxmox_host_input:
@@ -84,7 +164,24 @@ def get_proxmox_overrides():
     if username_input:
         proxmox_username = username_input
 
-    proxmox_password = getpass.getpass('Password: ')
+    # Only prompt for a password if there is no token or usable cached ticket
+    if args.token_name:
+        proxmox_token_value = os.environ.get('PROXMOX_TOKEN_VALUE') or \
+            getpass.getpass('API Token Secret: ')
+    else:
+        if args.ticket_cache:
+            ticket_cache = TicketCache(path=args.ticket_cache,
+                                       passphrase=os.environ.get('PROXMOX_TICKET_CACHE_KEY') or \
+                                           getpass.getpass('Ticket Cache Passphrase: '))
+
+        if ticket_cache:
+            cached_ticket = ticket_cache.get(host=proxmox_host,
+                                             username=proxmox_username)
+
+        if cached_ticket:
+            print('Using cached Proxmox ticket')
+        else:
+            proxmox_password = getpass.getpass('Password: ')
 
     vm_pin_method = input('Pin VMs to [n]ode, [c]luster or n[E]ither? ').lower()
     if vm_pin_method not in ['n','c', 'e']:
@@ -177,6 +274,43 @@ def get_node_vms(node_name: str) -> list:
     except ConnectionError as e:
         raise ConnectionError(f"Error retrieving VMs for node {node_name}: {e}")
 
+def get_selected_vms() -> dict:
+    """
+    Get the VMs selected by the discovery filter, grouped by node.
+
+    The cheapest listing for the filter is used: the member list of a pool, 
+    a single cluster-wide resource listing, or the VM list of each selected 
+    node. Unselected VMs are dropped before any per-VM request is made.
+
+    Returns:
+        dict: Node name mapped to the list of selected VMs on that node.
+    """
+
+    _node_names = [node['node'] for node in data_tree['nodes']]
+
+    match discovery_filter.listing():
+        case 'pool':
+            try:
+                _raw_vms = proxmox_api.pools(discovery_filter.pool).get()['members']
+            except ConnectionError as e:
+                raise ConnectionError(f'Error retrieving members of pool ' \
+                                      f'{discovery_filter.pool}: {e}')
+        case 'cluster':
+            try:
+                _raw_vms = proxmox_api.cluster.resources.get(type='vm')
+            except ConnectionError as e:
+                raise ConnectionError(f'Error retrieving cluster resources: {e}')
+        case _:
+            # Only list the VMs of the selected nodes
+            return {node_name: discovery_filter.filter_vms(get_node_vms(node_name))
+                    for node_name in _node_names}
+
+    # Pools and cluster resources also list containers and storage
+    _raw_vms = [vm for vm in _raw_vms if vm.get('type') == 'qemu']
+    _grouped = group_by_node(discovery_filter.filter_vms(_raw_vms))
+
+    return {node_name: _grouped.get(node_name, []) for node_name in _node_names}
+
 def get_vm_config(node_name: str, vm_id: int) -> dict:
     """
     Get the configuration of the specified VM. Please note that this is just 
@@ -218,7 +352,7 @@ def get_vm_fs(node_name: str, vm_id: int) -> dict:
     try:
         _disks = proxmox_api.nodes(node_name).qemu(vm_id).agent.get(
             'get-fsinfo')
-        return _disks['data']
+        return _disks['result']
     except ConnectionError as e:
         raise ConnectionError(f"Error retrieving filesystem for VM {vm_id} " \
                               "on node {node_name}: {e}")
@@ -271,35 +405,6 @@ def get_netbox_version() -> tuple:
 
     return (major,minor)
 
-def extract_vm_disks(vm_config: dict) -> list:
-    """
-    Extract and return a list of VM disks.
-    
-    Args:
-        vm_config (dict): The VM config to examine.
-
-    Returns:
-        list: List of dicts containing VM disk information
-    """
-
-    _disks = []
-
-    # Iterate through the provided dict and find only storage devices
-    for key, value in vm_config.items():
-        _disk = {}
-        if (key.startswith('ide') or key.startswith('scsi')) and not key.startswith('scsihw') : # Indicates a storage device
-            _size_raw = int(str(value).split('size=')[1][:-1])
-            _size = 0
-            # Check if the size is shown in MB or GB
-            if value.endswith('M'):
-                _size = _size_raw
-            elif value.endswith('G'):
-                _size = _size_raw * 1024
-            _disk[key] = _size
-            _disks.append(_disk)
-    
-    return _disks
-
 def extract_vnics(vm_config: dict, node: str, vm: int ) -> list:
     """
     Compile a list of vNICs connected to the VM
@@ -364,6 +469,11 @@ def start_ingestion():
     # Now we need to check the NetBox version
     netbox_version = get_netbox_version()
 
+    # Load the IPAM data once, and check for conflicts before any writes
+    print('Loading NetBox prefixes and IP Addresses')
+    if not validate_ips():
+        return
+
     # Now we need to validate that the nodes exist as NetBox devices
     # Only execute this if we chose to pin the VM to a node
     if data_tree['pin_mode'] == 'n':
@@ -385,7 +495,8 @@ def start_ingestion():
     
     # And finally, create the VMs
     print(f'Processing VMs')
-    process_vms()
+    with profiler.stage('process_vms'):
+        process_vms()
 
 def validate_nodes() -> bool:
     """Validate all Proxmox nodes exist as NetBox devices"""
@@ -486,28 +597,26 @@ def validate_vm(vm_name: str) -> bool:
     
     return True # VM exists
 
-def validate_ip(ip_address: str) -> int:
-    """
-    Check if an IP Address exists
+def validate_ips() -> bool:
+    """Validate all discovered IP Addresses against NetBox IPAM"""
 
-    Args:
-        ip_address (str): IP Address to validate
-    
-    Returns:
-        int: Object ID if address exists, 0 if not
-    """
+    _addresses = [ip['address'] for vm in data_tree['vms']
+                  for vnic in vm.get('network', []) for ip in vnic['ips']]
 
-    # Check if the address exists
-    try:
-        results = netbox_api.ipam.ip_addresses.get(address=ip_address)
-    except ConnectionError as e:
-        print(f'Error connecting to NetBox API: {e}')
-        return 0
-    
-    if results:
-        return results['id']
-    
-    return 0
+    if not ipam_resolver.load(netbox_api=netbox_api, addresses=_addresses):
+        return False
+
+    conflicts = ipam_resolver.find_conflicts(vms=data_tree['vms'])
+
+    # If even one address conflicts, fail the entire process
+    if len(conflicts) != 0:
+        print('The following IP Address conflicts were found:')
+        for conflict in conflicts:
+            print(f'{conflict.address}: {conflict.reason} ({", ".join(conflict.owners)})')
+        print('Processing cannot continue until this has been resolved')
+        return False
+
+    return True
 
 def create_cluster_type() -> bool:
     """Create new cluster type"""
@@ -624,7 +733,14 @@ def create_vm(vm_details: dict) -> int:
     if 'disks' in vm_details:
         for disk in vm_details['disks']:
             for disk_name, disk_size in disk.items():
-                create_disk(name=disk_name, vm_id=vm_id, size=disk_size)
+                # Record the guest filesystem usage if it was collected
+                _usage = vm_details.get('filesystems', {}).get(disk_name)
+                _description = ''
+                if _usage:
+                    _description = f'{_usage["used_bytes"] // 1048576} MB used of ' \
+                                   f'{_usage["total_bytes"] // 1048576} MB'
+                create_disk(name=disk_name, vm_id=vm_id, size=disk_size,
+                            description=_description)
                 print(f'Created disk {disk_name} of size {disk_size} MB for VM ID {vm_id}')
     
 
@@ -694,22 +810,50 @@ def create_ip(ip_address: str, interface_id: int):
     Create a new IP address
     """
 
-    # TODO: Add IP Address creation logic
+    # Link-local and loopback addresses do not belong in IPAM
+    if is_local_address(ip_address):
+        print(f'Skipping link-local or loopback IP Address {ip_address}')
+        return 0
 
-    # Validate the IP does not exist yet
-    ip_id = validate_ip(ip_address=ip_address)
+    # Resolve the containing prefix and VRF from the preloaded IPAM data
+    resolved = ipam_resolver.resolve(address=ip_address)
 
     # If it does exist, return the object ID
-    if ip_id != 0:
-        print(f'IP Address {ip_address} already exists with ID {ip_id}')
-        return ip_id
+    if resolved.existing is not None:
+        print(f'IP Address {ip_address} already exists with ID {resolved.existing_id}')
+        if resolved.existing.assigned_to:
+            # validate_ips() only lets through addresses assigned to this vNIC
+            return resolved.existing_id
+
+        # Assign the unassigned address to the vNIC, or it would be left without it
+        try:
+            netbox_api.ipam.ip_addresses.get(resolved.existing_id).update(
+                {'assigned_object_type': 'virtualization.vminterface',
+                 'assigned_object_id': interface_id})
+        except ConnectionError as e:
+            print(f'Error connecting to NetBox API: {e}')
+            return 0
+        resolved.existing.assigned_object_type = 'virtualization.vminterface'
+        resolved.existing.assigned_object_id = interface_id
+        return resolved.existing_id
+
+    if resolved.prefix is None:
+        print(f'IP Address {ip_address} is not within any NetBox prefix')
+    elif resolved.mask_mismatch:
+        print(f'IP Address {ip_address} does not match the mask of prefix {resolved.prefix.prefix}')
     
     # Now create an IP Address and return the object ID
     try:
         results = netbox_api.ipam.ip_addresses.create(address=ip_address,
+                                                      vrf=resolved.vrf_id,
                                                       assigned_object_type='virtualization.vminterface',
                                                     assigned_object_id=interface_id,
                                                     status='active')
+        ipam_resolver.add_existing(address=ip_address,
+                                   netbox_id=results['id'],
+                                   vrf_id=resolved.vrf_id,
+                                   assigned_object_type='virtualization.vminterface',
+                                   assigned_object_id=interface_id)
         return results['id']
     except ConnectionError as e:
         print(f'Error connecting to NetBox API: {e}')
@@ -718,7 +862,7 @@ def create_ip(ip_address: str, interface_id: int):
 
     return 0 # There was an error
 
-def create_disk(name: str, vm_id: int, size: int) -> int:
+def create_disk(name: str, vm_id: int, size: int, description: str = '') -> int:
     """
     Create a new Disk in NetBox
 
@@ -726,6 +870,7 @@ def create_disk(name: str, vm_id: int, size: int) -> int:
         name (str): The disk name
         vm_id (int): The VM NetBox ID
         size (int): The disk size in MB
+        description (str): Optional disk description
 
     Returns:
         int: The created Disk ID
@@ -734,7 +879,8 @@ def create_disk(name: str, vm_id: int, size: int) -> int:
     try:
         results = netbox_api.virtualization.virtual_disks.create(virtual_machine=vm_id,
                                                         name=name,
-                                                        size=size)
+                                                        size=size,
+                                                        description=description)
     except ConnectionError as e:
         print(f'Error connecting to NetBox API: {e}')
         return 0
@@ -749,12 +895,33 @@ def create_disk(name: str, vm_id: int, size: int) -> int:
 current_node = ''
 current_vm = 0
 
+args = parse_arguments()
+
+if args.profile:
+    profiler = StageProfiler(output_dir=args.profile)
+    # Write the reports even if the run fails part way through
+    atexit.register(profiler.write_reports)
+
+discovery_filter = DiscoveryFilter(nodes=args.node,
+                                   pool=args.pool,
+                                   tags=args.tag,
+                                   vmid_min=args.vmid[0],
+                                   vmid_max=args.vmid[1],
+                                   name_glob=args.name,
+                                   running_only=args.running_only,
+                                   exclude_templates=args.exclude_templates)
+
 get_proxmox_overrides()
 
-proxmox_api = ProxmoxAPI(proxmox_host, 
-                         user=proxmox_username, 
-                         password=proxmox_password, 
-                         verify_ssl=False)
+proxmox_api = connect_proxmox(host=proxmox_host,
+                              user=proxmox_username,
+                              password=proxmox_password or None,
+                              token_name=args.token_name,
+                              token_value=proxmox_token_value,
+                              ticket_cache=ticket_cache,
+                              cached_ticket=cached_ticket,
+                              password_prompt=lambda: getpass.getpass('Password: '),
+                              verify_ssl=False)
 
 _cluster_members = {}
 _nodes_list = []
@@ -764,48 +931,103 @@ if vm_pin_method == 'c':
 else:
     populate_proxmox_nodes()
 
+# Drop any nodes that were not selected, and list only the selected VMs
+data_tree['nodes'] = [node for node in data_tree['nodes']
+                      if discovery_filter.match_node(node['node'])]
+_selected_vms = get_selected_vms()
+
+# Agent-enabled VMs, for the filesystem inventory stage
+_fsinfo_vms = []
+
+# Raw VM configs, in the same order as the VMs in the data tree
+_vm_configs = []
+
 # Now, iterate through this list
-for node in data_tree['nodes']:
-    current_node = node['node']
+with profiler.stage('discovery'):
+    for node in data_tree['nodes']:
+        current_node = node['node']
 
-    # Start by adding the required information from each node to the tree
-    _node_data = {}
-    _node_data['name'] = node['node']
-    _node_data['status'] = node['status']
+        # Start by adding the required information from each node to the tree
+        _node_data = {}
+        _node_data['name'] = node['node']
+        _node_data['status'] = node['status']
     
-    # For each node, get a list of VMs
-    _node_vms = get_node_vms(node['node'])
+        # For each node, get the list of selected VMs
+        _node_vms = _selected_vms[node['node']]
     
-    # For each VM, get the filesystem config
-    for vm in _node_vms:
-        current_vm = vm['vmid']
+        # For each VM, get the filesystem config
+        for vm in _node_vms:
+            current_vm = vm['vmid']
 
-        _vm_config = get_vm_config(node_name=node['node'], vm_id=vm['vmid'])
+            _vm_config = get_vm_config(node_name=node['node'], vm_id=vm['vmid'])
         
-        print(f'Now processing VM ID {vm["vmid"]} with name {_vm_config["name"]} on node {node["node"]}')
-
-        # Add the required base information for each VM
-        _vm_data = {}
-        _vm_data['name'] = _vm_config['name']
-        _vm_data['ram'] = int(_vm_config['memory'])
-        _vm_data['cpu'] = int(_vm_config['cores']) * int(_vm_config['sockets'])
-        _vm_data['node'] = current_node
-        _vm_data['status'] = vm['status']
+            print(f'Now processing VM ID {vm["vmid"]} with name {_vm_config["name"]} on node {node["node"]}')
+
+            # Add the required base information for each VM
+            _vm_data = {}
+            _vm_data['vmid'] = vm['vmid']
+            _vm_data['name'] = _vm_config['name']
+            _vm_data['node'] = current_node
+            _vm_data['status'] = vm['status']
         
-        # Now add the disks. These are only available if the agent is installed
-        if 'agent' in _vm_config:
-            _vm_data['disks'] = extract_vm_disks(vm_config=_vm_config)
-
-            # Now get the network information
-            _vm_data['network'] = extract_vnics(vm_config=_vm_config,
-                                                node=node['node'],
-                                                vm=vm['vmid'])
-
-        data_tree['vms'].append(_vm_data)
+            # Now get the network information. This is only available if the 
+            # agent is installed
+            if 'agent' in _vm_config:
+                with profiler.stage('extract'):
+                    _vm_data['network'] = extract_vnics(vm_config=_vm_config,
+                                                        node=node['node'],
+                                                        vm=vm['vmid'])
+
+                # The agent only responds on running VMs
+                if vm['status'] == 'running':
+                    _fsinfo_vms.append({'node': node['node'],
+                                        'vmid': vm['vmid'],
+                                        'digest': disk_digest(_vm_config)})
+
+            data_tree['vms'].append(_vm_data)
+            _vm_configs.append(_vm_config)
+
+# Convert the memory, CPU and disk sizes of every VM in a single batch
+with profiler.stage('extract'):
+    _inventory, _issues = normalize_inventory(configs=_vm_configs)
+if len(_issues) != 0:
+    print('The following values could not be parsed:')
+    for issue in _issues:
+        print(f'VM {issue.vm_name}: {issue.field} = "{issue.value}"')
+
+for row, _vm_data in enumerate(data_tree['vms']):
+    _vm_data['ram'] = _inventory.memory_mb[row]
+    _vm_data['cpu'] = _inventory.vcpus[row]
+    _vm_data['disks'] = _inventory.disks_for(row)
+
+# Optionally collect the guest filesystem usage of every agent-enabled VM
+if args.fsinfo:
+    print(f'Collecting filesystems for {len(_fsinfo_vms)} VMs')
+    _fsinfo_cache = None
+    if args.fsinfo_cache:
+        _fsinfo_cache = FsInfoCache(path=args.fsinfo_cache,
+                                    max_age=args.fsinfo_max_age)
+
+    _vm_filesystems = collect_fsinfo(vms=_fsinfo_vms,
+                                     fetch=get_vm_fs,
+                                     cache=_fsinfo_cache,
+                                     max_workers=args.workers)
+    if _fsinfo_cache:
+        _fsinfo_cache.save()
+
+    for _vm_data in data_tree['vms']:
+        if _vm_data['vmid'] in _vm_filesystems:
+            _vm_data['filesystems'] = _vm_filesystems[_vm_data['vmid']]
+
+# Keep a snapshot of the discovered data for auditing
+if args.snapshot:
+    write_snapshot(path=args.snapshot, data_tree=data_tree)
+    print(f'Snapshot of {len(data_tree["vms"])} VMs written to {args.snapshot}')
 
 print('The following VM data was discovered:')
 print(json.dumps(data_tree, indent=2))
 
 ingest_to_netbox = input('Do you want to ingest this into NetBox? [y/N] ').lower()
 if ingest_to_netbox == 'y':
-    start_ingestion()
+    with profiler.stage('ingestion'):
+        start_ingestion()
@@ -0,0 +1,54 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+import datetime
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def tls_files(tmp_path_factory):
+    """A self-signed certificate and key, as the Proxmox client needs HTTPS"""
+
+    x509 = pytest.importorskip('cryptography.x509')
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    _key = ec.generate_private_key(ec.SECP256R1())
+    _name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'localhost')])
+    _now = datetime.datetime.now(datetime.timezone.utc)
+    _cert = (x509.CertificateBuilder()
+             .subject_name(_name)
+             .issuer_name(_name)
+             .public_key(_key.public_key())
+             .serial_number(x509.random_serial_number())
+             .not_valid_before(_now - datetime.timedelta(days=1))
+             .not_valid_after(_now + datetime.timedelta(days=1))
+             .sign(_key, hashes.SHA256()))
+
+    _dir = tmp_path_factory.mktemp('tls')
+    certfile, keyfile = _dir / 'cert.pem', _dir / 'key.pem'
+    certfile.write_bytes(_cert.public_bytes(serialization.Encoding.PEM))
+    keyfile.write_bytes(_key.private_bytes(serialization.Encoding.PEM,
+                                           serialization.PrivateFormat.PKCS8,
+                                           serialization.NoEncryption()))
+
+    return str(certfile), str(keyfile)
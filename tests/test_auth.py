@@ -0,0 +1,119 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip('cryptography')
+
+# The stand-in uses a self-signed certificate
+pytestmark = pytest.mark.filterwarnings('ignore::urllib3.exceptions.InsecureRequestWarning')
+
+from netbox_proxmox_ingester.auth import TicketCache, connect_proxmox
+from netbox_proxmox_ingester.standin import ProxmoxStandin
+
+
+@pytest.fixture
+def proxmox(tls_files):
+    certfile, keyfile = tls_files
+    with ProxmoxStandin(password='pw', certfile=certfile,
+                        keyfile=keyfile) as standin:
+        yield standin
+
+
+def test_ticket_cache_round_trip(tmp_path):
+    cache = TicketCache(tmp_path / 'tickets', passphrase='secret')
+    ticket = f'PVE:api@pve:{int(time.time()):08X}::signature'
+    cache.put(host='pve', username='api@pve', ticket=ticket, csrf_token='csrf')
+
+    reopened = TicketCache(tmp_path / 'tickets', passphrase='secret')
+    assert reopened.get(host='PVE', username='api@pve')['ticket'] == ticket
+    assert TicketCache(tmp_path / 'tickets', passphrase='wrong').get(
+        host='pve', username='api@pve') is None
+
+    reopened.discard(host='pve', username='api@pve')
+    assert cache.get(host='pve', username='api@pve') is None
+
+
+def test_cached_ticket_skips_login(proxmox, tmp_path):
+    host = f'127.0.0.1:{proxmox.port}'
+    cache = TicketCache(tmp_path / 'tickets', passphrase='secret')
+
+    connect_proxmox(host, user='api@pve', password='pw', ticket_cache=cache).nodes.get()
+    api = connect_proxmox(host, user='api@pve', ticket_cache=cache)
+    api.nodes.get()
+
+    assert proxmox.stats.get('logins') == 1
+
+
+def test_rejected_ticket_falls_back_to_password(proxmox, tmp_path):
+    host = f'127.0.0.1:{proxmox.port}'
+    cache = TicketCache(tmp_path / 'tickets', passphrase='secret')
+    # A ticket the server never issued, e.g. from before a restart
+    cache.put(host=host, username='api@pve', csrf_token='csrf',
+              ticket=f'PVE:api@pve:{int(time.time()):08X}::revoked')
+
+    prompts = []
+
+    def _prompt() -> str:
+        prompts.append(True)
+        return 'pw'
+
+    api = connect_proxmox(host, user='api@pve', ticket_cache=cache,
+                          password_prompt=_prompt)
+
+    assert len(api.nodes.get()) == 1
+    assert prompts == [True]
+    assert not cache.get(host=host, username='api@pve')['ticket'].endswith('::revoked')
+
+
+def test_failed_renewal_falls_back_to_password(proxmox):
+    host = f'127.0.0.1:{proxmox.port}'
+    stale = {'ticket': 'PVE:api@pve:00000000::revoked', 'csrf_token': 'csrf',
+             'issued': time.time() - 4000}
+
+    api = connect_proxmox(host, user='api@pve', cached_ticket=stale,
+                          password_prompt=lambda: 'pw')
+
+    assert len(api.nodes.get()) == 1
+    assert proxmox.stats.get('logins') == 2
+
+
+def test_failed_renewal_mid_run_logs_in_once(proxmox):
+    host = f'127.0.0.1:{proxmox.port}'
+    prompts = []
+
+    def _prompt() -> str:
+        prompts.append(True)
+        return 'pw'
+
+    api = connect_proxmox(host, user='api@pve', password='pw',
+                          password_prompt=_prompt)
+    api.nodes.get()
+
+    # The server forgets every ticket, and the ticket is due for renewal
+    proxmox._tickets.clear()
+    auth = api._store['session'].auth
+    auth.birth_time -= auth.renew_age
+
+    assert len(api.nodes.get()) == 1
+    assert prompts == [True]
+    assert proxmox.stats.get('logins') == 3
@@ -0,0 +1,120 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+import pytest
+
+from netbox_proxmox_ingester.filters import (DiscoveryFilter, group_by_node,
+                                              parse_vmid_range)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('100-199', (100, 199)),
+    ('100-', (100, None)),
+    ('-199', (None, 199)),
+    ('150', (150, 150)),
+    ('', (None, None)),
+])
+def test_parse_vmid_range(value, expected):
+    assert parse_vmid_range(value) == expected
+
+
+@pytest.mark.parametrize('value', ['199-100', 'abc', '100-abc', '1-2-3'])
+def test_parse_vmid_range_rejects_invalid_ranges(value):
+    with pytest.raises(ValueError):
+        parse_vmid_range(value)
+
+
+def _vm(vmid, name='', node='pve1', status='running', template=0, tags=''):
+    return {'vmid': vmid, 'name': name, 'node': node, 'status': status,
+            'template': template, 'tags': tags}
+
+
+@pytest.mark.parametrize('vm_filter, vm, expected', [
+    (DiscoveryFilter(vmid_min=100), _vm(100), True),
+    (DiscoveryFilter(vmid_min=100), _vm(99), False),
+    (DiscoveryFilter(vmid_max=199), _vm(199), True),
+    (DiscoveryFilter(vmid_max=199), _vm(200), False),
+    (DiscoveryFilter(vmid_min=100, vmid_max=199), _vm('150'), True),
+    (DiscoveryFilter(running_only=True), _vm(100, status='stopped'), False),
+    (DiscoveryFilter(running_only=True), _vm(100), True),
+    (DiscoveryFilter(exclude_templates=True), _vm(100, template=1), False),
+    (DiscoveryFilter(exclude_templates=True), _vm(100, template='0'), True),
+    (DiscoveryFilter(), _vm(100, template=1), True),
+    (DiscoveryFilter(name_glob='web-*'), _vm(100, name='web-01'), True),
+    (DiscoveryFilter(name_glob='web-*'), _vm(100, name='db-01'), False),
+    (DiscoveryFilter(name_glob='web-*'), _vm(100, name='WEB-01'), False),
+    (DiscoveryFilter(tags=['db']), _vm(100, tags='prod;db'), True),
+    (DiscoveryFilter(tags=['db']), _vm(100, tags='prod,db'), True),
+    (DiscoveryFilter(tags=['db']), _vm(100, tags='prod;dbx'), False),
+    (DiscoveryFilter(tags=['db']), _vm(100), False),
+    (DiscoveryFilter(tags=['db', 'web']), _vm(100, tags='web'), True),
+])
+def test_match_vm(vm_filter, vm, expected):
+    assert vm_filter.match_vm(vm) is expected
+
+
+def test_match_vm_requires_every_criterion():
+    vm_filter = DiscoveryFilter(tags=['prod'], name_glob='web-*',
+                                running_only=True)
+
+    assert vm_filter.match_vm(_vm(100, name='web-01', tags='prod'))
+    assert not vm_filter.match_vm(_vm(100, name='web-01', tags='prod',
+                                      status='stopped'))
+    assert not vm_filter.match_vm(_vm(100, name='db-01', tags='prod'))
+
+
+def test_match_node():
+    assert DiscoveryFilter().match_node('pve1')
+    assert DiscoveryFilter(nodes=['pve1']).match_node('pve1')
+    assert not DiscoveryFilter(nodes=['pve1']).match_node('pve2')
+
+
+def test_filter_vms_keeps_listing_order():
+    vms = [_vm(300), _vm(100), _vm(200), _vm(400)]
+
+    kept = DiscoveryFilter(vmid_min=150, vmid_max=350).filter_vms(vms)
+
+    assert [vm['vmid'] for vm in kept] == [300, 200]
+
+
+def test_group_by_node():
+    vms = [_vm(100, node='pve1'), _vm(101, node='pve2'),
+           _vm(102, node='pve1')]
+
+    grouped = group_by_node(vms)
+
+    assert {node: [vm['vmid'] for vm in node_vms]
+            for node, node_vms in grouped.items()} == {'pve1': [100, 102],
+                                                       'pve2': [101]}
+    assert group_by_node([]) == {}
+
+
+@pytest.mark.parametrize('vm_filter, expected', [
+    (DiscoveryFilter(), 'nodes'),
+    (DiscoveryFilter(nodes=['pve1']), 'nodes'),
+    (DiscoveryFilter(nodes=['pve1'], tags=['db']), 'nodes'),
+    (DiscoveryFilter(tags=['db']), 'cluster'),
+    (DiscoveryFilter(vmid_min=100), 'cluster'),
+    (DiscoveryFilter(running_only=True), 'cluster'),
+    (DiscoveryFilter(pool='prod'), 'pool'),
+    (DiscoveryFilter(pool='prod', nodes=['pve1'], tags=['db']), 'pool'),
+])
+def test_listing(vm_filter, expected):
+    assert vm_filter.listing() == expected
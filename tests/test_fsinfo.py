@@ -0,0 +1,121 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+import json
+
+from netbox_proxmox_ingester.fsinfo import (FsInfoCache, disk_digest,
+                                            disk_key_from_serial, map_filesystems)
+
+
+def _filesystem(name: str, mountpoint: str, used: int, total: int,
+                serial: str) -> dict:
+    return {'name': name, 'mountpoint': mountpoint, 'type': 'ext4',
+            'used-bytes': used, 'total-bytes': total,
+            'disk': [{'serial': serial, 'bus-type': 'scsi'}]}
+
+
+def test_disk_key_from_serial():
+    assert disk_key_from_serial('0QEMU_QEMU_HARDDISK_drive-scsi0') == 'scsi0'
+    assert disk_key_from_serial('drive-virtio12') == 'virtio12'
+    assert disk_key_from_serial('S3Z9NB0K') is None
+    assert disk_key_from_serial(None) is None
+
+
+def test_map_filesystems_sums_per_disk():
+    disks = map_filesystems([
+        _filesystem('sda1', '/', 10, 100, '0QEMU_QEMU_HARDDISK_drive-scsi0'),
+        _filesystem('sda2', '/boot', 1, 5, '0QEMU_QEMU_HARDDISK_drive-scsi0'),
+        _filesystem('sdb1', '/data', 7, 50, '0QEMU_QEMU_HARDDISK_drive-scsi1'),
+    ])
+
+    assert disks['scsi0']['used_bytes'] == 11
+    assert disks['scsi0']['total_bytes'] == 105
+    assert [fs['mountpoint'] for fs in disks['scsi0']['filesystems']] == ['/', '/boot']
+    assert disks['scsi1']['total_bytes'] == 50
+
+
+def test_map_filesystems_counts_bind_mounts_once_and_skips_non_qemu_disks():
+    disks = map_filesystems([
+        _filesystem('sda1', '/', 10, 100, 'drive-scsi0'),
+        _filesystem('sda1', '/var/lib/docker', 10, 100, 'drive-scsi0'),
+        {'name': 'loop0', 'mountpoint': '/snap/core', 'type': 'squashfs',
+         'used-bytes': 5, 'total-bytes': 5, 'disk': []},
+    ])
+
+    assert list(disks) == ['scsi0']
+    assert disks['scsi0']['used_bytes'] == 10
+
+
+def test_map_filesystems_splits_filesystems_spanning_disks():
+    volume = _filesystem('dm-0', '/srv', 101, 301, 'drive-scsi0')
+    volume['disk'] = [{'serial': 'drive-scsi0'}, {'serial': 'drive-scsi1'},
+                      {'serial': 'drive-scsi0'}]
+
+    disks = map_filesystems([
+        _filesystem('sda1', '/', 10, 100, 'drive-scsi0'),
+        volume,
+    ])
+
+    assert disks['scsi0']['used_bytes'] == 10 + 51
+    assert disks['scsi0']['total_bytes'] == 100 + 151
+    assert disks['scsi1']['used_bytes'] == 50
+    assert disks['scsi1']['total_bytes'] == 150
+    assert sum(disk['total_bytes'] for disk in disks.values()) == 100 + 301
+    assert disks['scsi1']['filesystems'][0]['disks'] == ['scsi0', 'scsi1']
+    assert disks['scsi0']['filesystems'][0]['disks'] == ['scsi0']
+
+
+def test_disk_digest_only_changes_with_disks():
+    config = {'scsi0': 'local-lvm:vm-1-disk-0,size=32G', 'parent': 'snap1',
+              'digest': 'aaaa', 'memory': '2048'}
+
+    assert disk_digest(config) == disk_digest(dict(config, parent='snap2',
+                                                   digest='bbbb', memory='4096'))
+    assert disk_digest(config) != disk_digest(dict(config,
+                                                   scsi0='local-lvm:vm-1-disk-0,size=64G'))
+    assert disk_digest(config) != disk_digest(dict(config,
+                                                   scsi1='local-lvm:vm-1-disk-1,size=8G'))
+
+
+def test_fsinfo_cache_round_trip_and_invalidation(tmp_path):
+    path = tmp_path / 'fsinfo.json'
+    cache = FsInfoCache(path)
+    cache.put('pve1', 101, 'digest-a', {'scsi0': {'used_bytes': 1}})
+    cache.save()
+
+    cache = FsInfoCache(path)
+    assert cache.get('pve1', 101, 'digest-a') == {'scsi0': {'used_bytes': 1}}
+    assert cache.get('pve1', 101, 'digest-b') is None
+    assert cache.get('pve2', 101, 'digest-a') is None
+
+    assert FsInfoCache(path, max_age=0).get('pve1', 101, 'digest-a') is None
+
+
+def test_fsinfo_cache_ignores_unreadable_file(tmp_path):
+    path = tmp_path / 'fsinfo.json'
+    path.write_text('{not json')
+
+    cache = FsInfoCache(path)
+    assert cache.get('pve1', 101, 'digest-a') is None
+
+    cache.put('pve1', 101, 'digest-a', {})
+    cache.save()
+    assert json.loads(path.read_text())['pve1/101']['digest'] == 'digest-a'
+    assert [entry.name for entry in tmp_path.iterdir()] == ['fsinfo.json']
@@ -0,0 +1,169 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+import pynetbox
+import pytest
+
+from netbox_proxmox_ingester.ipam import (IpamResolver, PrefixEntry, PrefixTrie,
+                                          is_local_address)
+from netbox_proxmox_ingester.standin import NetBoxStandin
+
+
+@pytest.fixture
+def netbox():
+    with NetBoxStandin(seed=False) as standin:
+        yield standin
+
+
+def _vm(name: str, *addresses: str, vnic: str = 'ens18') -> dict:
+    return {'name': name,
+            'network': [{'name': vnic,
+                         'ips': [{'address': address} for address in addresses]}]}
+
+
+def test_longest_match_prefers_most_specific_prefix():
+    trie = PrefixTrie()
+    for prefix in ('10.0.0.0/8', '10.1.0.0/16', '10.1.2.0/24', '2001:db8::/32'):
+        trie.insert(PrefixEntry(prefix=prefix))
+
+    assert [e.prefix for e in trie.longest_match('10.1.2.3/24')] == ['10.1.2.0/24']
+    assert [e.prefix for e in trie.longest_match('10.1.9.9')] == ['10.1.0.0/16']
+    assert [e.prefix for e in trie.longest_match('10.200.0.1')] == ['10.0.0.0/8']
+    assert [e.prefix for e in trie.longest_match('2001:db8::1/64')] == ['2001:db8::/32']
+    assert trie.longest_match('192.168.0.1') == []
+    assert len(trie) == 4
+
+
+def test_longest_match_returns_every_vrf_of_a_prefix():
+    trie = PrefixTrie()
+    trie.insert(PrefixEntry(prefix='10.0.0.0/24', vrf_id=1))
+    trie.insert(PrefixEntry(prefix='10.0.0.0/24', vrf_id=2))
+
+    assert [e.vrf_id for e in trie.longest_match('10.0.0.5')] == [1, 2]
+
+
+def test_resolve_prefers_global_table_and_flags_ambiguity():
+    resolver = IpamResolver()
+    resolver.add_prefix(PrefixEntry(prefix='10.0.0.0/24', vrf_id=1))
+    resolver.add_prefix(PrefixEntry(prefix='10.0.0.0/24'))
+    resolver.add_prefix(PrefixEntry(prefix='10.9.0.0/24', vrf_id=1))
+    resolver.add_prefix(PrefixEntry(prefix='10.9.0.0/24', vrf_id=2))
+
+    placed = resolver.resolve('10.0.0.5/24')
+    assert placed.vrf_id is None
+    assert not placed.ambiguous
+
+    assert resolver.resolve('10.9.0.5/24').ambiguous
+    assert resolver.resolve('10.0.0.5/16').mask_mismatch
+
+
+def test_resolve_finds_existing_address_in_its_vrf():
+    resolver = IpamResolver()
+    resolver.add_prefix(PrefixEntry(prefix='10.0.0.0/24', vrf_id=3))
+    resolver.add_existing(address='10.0.0.5/24', netbox_id=42, vrf_id=3)
+    resolver.add_existing(address='10.0.0.6/24', netbox_id=43)
+
+    assert resolver.resolve('10.0.0.5/24').existing_id == 42
+    # The same host in another VRF is a different address
+    assert resolver.resolve('10.0.0.6/24').existing_id == 0
+
+
+def test_find_conflicts_reports_duplicates_within_a_vrf():
+    resolver = IpamResolver()
+    resolver.add_prefix(PrefixEntry(prefix='10.0.0.0/24'))
+
+    conflicts = resolver.find_conflicts([_vm('a', '10.0.0.5/24'),
+                                         _vm('b', '10.0.0.5/24'),
+                                         _vm('c', '10.0.0.6/24')])
+
+    assert len(conflicts) == 1
+    assert conflicts[0].address == '10.0.0.5'
+    assert conflicts[0].owners == ['a/ens18', 'b/ens18']
+
+
+def test_find_conflicts_reports_ambiguous_prefixes():
+    resolver = IpamResolver()
+    resolver.add_prefix(PrefixEntry(prefix='10.0.0.0/24', vrf_id=1))
+    resolver.add_prefix(PrefixEntry(prefix='10.0.0.0/24', vrf_id=2))
+
+    conflicts = resolver.find_conflicts([_vm('a', '10.0.0.5/24')])
+
+    assert [c.reason for c in conflicts] == ['prefix exists in more than one VRF']
+
+
+def test_find_conflicts_ignores_link_local_and_loopback():
+    resolver = IpamResolver()
+
+    vms = [_vm(name, '127.0.0.1/8', '::1/128', 'fe80::1/64', '169.254.0.1/16')
+           for name in ('a', 'b')]
+
+    assert resolver.find_conflicts(vms) == []
+
+
+def test_find_conflicts_reports_addresses_assigned_elsewhere():
+    resolver = IpamResolver()
+    resolver.add_prefix(PrefixEntry(prefix='10.0.0.0/24'))
+    resolver.add_existing(address='10.0.0.5/24', netbox_id=1,
+                          assigned_object_type='virtualization.vminterface',
+                          assigned_object_id=7, assigned_owner='old/ens18')
+    resolver.add_existing(address='10.0.0.6/24', netbox_id=2,
+                          assigned_object_type='dcim.interface',
+                          assigned_object_id=8)
+    resolver.add_existing(address='10.0.0.7/24', netbox_id=3)
+    resolver.add_existing(address='10.0.0.8/24', netbox_id=4,
+                          assigned_object_type='virtualization.vminterface',
+                          assigned_object_id=9, assigned_owner='a/ens18')
+
+    conflicts = resolver.find_conflicts([_vm('a', '10.0.0.5/24', '10.0.0.6/24',
+                                             '10.0.0.7/24', '10.0.0.8/24')])
+
+    assert [(c.address, c.reason) for c in conflicts] == [
+        ('10.0.0.5/24', 'already assigned to old/ens18'),
+        ('10.0.0.6/24', 'already assigned to dcim.interface 8'),
+    ]
+
+
+def test_load_keeps_the_assigned_object(netbox):
+    api = pynetbox.api(netbox.url, token='x')
+    vm = api.virtualization.virtual_machines.create(name='old')
+    vnic = api.virtualization.interfaces.create(virtual_machine=vm.id,
+                                                name='ens18')
+    api.ipam.ip_addresses.create(address='10.0.0.5/24', vrf=None,
+                                 assigned_object_type='virtualization.vminterface',
+                                 assigned_object_id=vnic.id)
+    api.ipam.ip_addresses.create(address='10.0.0.6/24', vrf=None)
+
+    resolver = IpamResolver()
+    assert resolver.load(api, ['10.0.0.5/24', '10.0.0.6/24'])
+
+    assert resolver.resolve('10.0.0.5/24').existing.assigned_to == 'old/ens18'
+    assert resolver.resolve('10.0.0.6/24').existing.assigned_to == ''
+    # Re-discovering an address on its own vNIC is not a conflict
+    assert resolver.find_conflicts([_vm('old', '10.0.0.5/24')]) == []
+    assert [c.reason for c in resolver.find_conflicts([_vm('new', '10.0.0.5/24')])] \
+        == ['already assigned to old/ens18']
+
+
+def test_is_local_address():
+    assert is_local_address('fe80::80f5:7dff:feca:2e9d/64')
+    assert is_local_address('127.0.0.1/8')
+    assert is_local_address('::1')
+    assert not is_local_address('10.12.40.15/24')
+    assert not is_local_address('2001:db8::1/64')
@@ -0,0 +1,74 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+import pytest
+
+from netbox_proxmox_ingester.normalize import (is_cdrom, normalize_inventory,
+                                               parse_size)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('local-lvm:vm-101-disk-0,size=500G', 500 * 1024 ** 3),
+    ('local-lvm:vm-101-disk-0,iothread=1,size=32M,ssd=1', 32 * 1024 ** 2),
+    ('local:vm-101-disk-1,size=1.5T', int(1.5 * 1024 ** 4)),
+    ('local:vm-101-disk-2,size=4K', 4096),
+    ('local:vm-101-disk-3,size=1024', 1024),
+    ('local-lvm:vm-101-disk-0', None),
+    ('local:vm-101-disk-0,size=big', None),
+])
+def test_parse_size(value, expected):
+    assert parse_size(value) == expected
+
+
+def test_is_cdrom():
+    assert is_cdrom('local:iso/debian.iso,media=cdrom,size=600M')
+    assert is_cdrom('none,media=cdrom')
+    assert not is_cdrom('local-lvm:vm-101-disk-0,size=32G')
+
+
+def test_normalize_inventory_converts_disks_to_mb_rounding_up():
+    inventory, issues = normalize_inventory([
+        {'name': 'a', 'memory': '2048', 'cores': 2, 'sockets': 2,
+         'scsi0': 'local-lvm:vm-1-disk-0,size=32G',
+         'virtio1': 'local-lvm:vm-1-disk-1,size=1025K',
+         'ide2': 'local:iso/debian.iso,media=cdrom,size=600M',
+         'unused0': 'local-lvm:vm-1-disk-2,size=8G',
+         'net0': 'virtio=02:00:00:00:00:01,bridge=vmbr0'},
+        {'name': 'b'},
+    ])
+
+    assert issues == []
+    assert len(inventory) == 2
+    assert inventory.disks_for(0) == [{'scsi0': 32768}, {'virtio1': 2}]
+    assert inventory.disks_for(1) == []
+    assert list(inventory.memory_mb) == [2048, 512]
+    assert list(inventory.vcpus) == [4, 1]
+
+
+def test_normalize_inventory_records_unparseable_values():
+    inventory, issues = normalize_inventory([
+        {'name': 'a', 'memory': 'lots', 'scsi0': 'local-lvm:vm-1-disk-0',
+         'scsi1': 'local-lvm:vm-1-disk-1,size=1G'},
+    ])
+
+    assert [(issue.field, issue.vm_name) for issue in issues] == \
+        [('memory', 'a'), ('scsi0', 'a')]
+    assert list(inventory.memory_mb) == [0]
+    assert inventory.disks_for(0) == [{'scsi1': 1024}]
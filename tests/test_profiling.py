@@ -0,0 +1,120 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from types import SimpleNamespace
+
+import os
+import time
+
+from netbox_proxmox_ingester.profiling import StageProfiler, collapsed_stacks
+
+_A = ('/src/a.py', 1, 'a')
+_B = ('/src/b.py', 2, 'b')
+_C = ('/src/c.py', 3, 'c')
+
+
+def test_disabled_profiler_is_a_no_op(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    profiler = StageProfiler()
+
+    assert not profiler.enabled
+    assert profiler.stage('discovery') is profiler.stage('ingestion')
+    with profiler.stage('discovery'):
+        pass
+    profiler.write_reports()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_nested_stage_time_is_excluded_from_outer_stage(tmp_path):
+    profiler = StageProfiler(output_dir=tmp_path)
+
+    with profiler.stage('outer') as outer:
+        time.sleep(0.05)
+        with profiler.stage('inner') as inner:
+            time.sleep(0.2)
+
+    assert 0.2 <= inner.wall_time < 0.3
+    assert 0.05 <= outer.wall_time < 0.15
+
+
+def test_reentering_running_stage_is_a_no_op(tmp_path):
+    profiler = StageProfiler(output_dir=tmp_path)
+
+    with profiler.stage('extract') as outer:
+        with profiler.stage('extract') as inner:
+            time.sleep(0.01)
+
+    assert inner is outer
+    assert outer.calls == 1
+    assert outer.wall_time >= 0.01
+
+
+def test_write_reports_writes_every_report_once(tmp_path, capsys):
+    profiler = StageProfiler(output_dir=tmp_path / 'profile')
+
+    with profiler.stage('discovery'):
+        sorted(str(i) for i in range(10000))
+    with profiler.stage('discovery'):
+        pass
+
+    profiler.write_reports()
+    reports = sorted(os.listdir(tmp_path / 'profile'))
+    assert reports == ['discovery.alloc.txt', 'discovery.collapsed',
+                       'discovery.pstats', 'discovery.txt', 'summary.txt']
+
+    summary = (tmp_path / 'profile' / 'summary.txt').read_text()
+    assert summary.startswith('discovery: 2 calls, ')
+    assert 'sorted by cumulative' in (tmp_path / 'profile' / 'discovery.txt').read_text()
+
+    # Later calls, e.g. from atexit, do not write anything
+    (tmp_path / 'profile' / 'summary.txt').unlink()
+    profiler.write_reports()
+    assert not (tmp_path / 'profile' / 'summary.txt').exists()
+    assert capsys.readouterr().out.count('Profiling reports') == 1
+
+
+def test_collapsed_stacks_of_a_call_chain():
+    # a calls b, which calls c. Each stats entry is (cc, nc, tt, ct, callers)
+    stats = SimpleNamespace(stats={
+        _A: (1, 1, 1.0, 4.0, {}),
+        _B: (1, 1, 2.0, 3.0, {_A: (1, 1, 2.0, 3.0)}),
+        _C: (1, 1, 1.0, 1.0, {_B: (1, 1, 1.0, 1.0)}),
+    })
+
+    assert collapsed_stacks(stats) == [
+        'a (a.py:1) 1000000',
+        'a (a.py:1);b (b.py:2) 2000000',
+        'a (a.py:1);b (b.py:2);c (c.py:3) 1000000',
+    ]
+
+
+def test_collapsed_stacks_split_shared_callees_by_caller_time():
+    # c is called from both a and b, with three quarters of its time under a
+    stats = SimpleNamespace(stats={
+        _A: (1, 1, 0.0, 3.0, {}),
+        _B: (1, 1, 0.0, 1.0, {_A: (1, 1, 0.0, 1.0)}),
+        _C: (2, 2, 2.0, 2.0, {_A: (1, 1, 1.5, 1.5), _B: (1, 1, 0.5, 0.5)}),
+    })
+
+    assert sorted(collapsed_stacks(stats)) == [
+        'a (a.py:1);b (b.py:2);c (c.py:3) 500000',
+        'a (a.py:1);c (c.py:3) 1500000',
+    ]
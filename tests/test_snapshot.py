@@ -0,0 +1,114 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+import json
+
+import pytest
+
+from netbox_proxmox_ingester.snapshot import (SnapshotError, SnapshotReader,
+                                              export_json, import_json,
+                                              write_snapshot)
+
+
+def _tree(count: int) -> dict:
+    return {
+        'pin_mode': 'n',
+        'nodes': [{'name': 'pve1', 'status': 'online'}],
+        'vms': [{'vmid': 100 + i, 'name': f'vm{i}', 'disks': [{'scsi0': 32768}]}
+                for i in range(count)],
+    }
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = tmp_path / 'tree.npxs'
+    write_snapshot(path, _tree(1000))
+    return path
+
+
+def test_round_trip(snapshot_path):
+    with SnapshotReader(snapshot_path, verify=True) as reader:
+        assert len(reader) == 1000
+        assert reader.to_tree() == _tree(1000)
+
+
+def test_lookup_by_vmid_and_name(snapshot_path):
+    with SnapshotReader(snapshot_path) as reader:
+        assert reader.get(150)['name'] == 'vm50'
+        assert reader.get('150')['name'] == 'vm50'
+        assert reader.get(99) is None
+        assert reader.get_by_name('vm999')['vmid'] == 1099
+        assert reader.get_by_name('missing') is None
+
+
+def test_duplicate_names_return_first_written(tmp_path):
+    path = tmp_path / 'tree.npxs'
+    write_snapshot(path, {'vms': [{'vmid': 1, 'name': 'a'},
+                                  {'vmid': 2, 'name': 'a'},
+                                  {'name': 'no-vmid'}]})
+
+    with SnapshotReader(path) as reader:
+        assert reader.get_by_name('a')['vmid'] == 1
+        assert reader.get(2)['vmid'] == 2
+        assert reader.get_by_name('no-vmid') == {'name': 'no-vmid'}
+
+
+def test_iter_raw_can_be_held_across_close(snapshot_path):
+    total = 0
+    with SnapshotReader(snapshot_path) as reader:
+        for record in reader.iter_raw():
+            total += len(record)
+        held = reader.raw(0)
+
+    assert total > 0
+    with pytest.raises(ValueError):
+        bytes(held)
+
+
+def test_corrupt_and_foreign_files_are_rejected(tmp_path, snapshot_path):
+    _data = bytearray(snapshot_path.read_bytes())
+    # Flip a byte inside a VM record, which the payload checksum covers
+    _data[_data.index(b'"vm500"') + 3] ^= 0x01
+    corrupt = tmp_path / 'corrupt.npxs'
+    corrupt.write_bytes(bytes(_data))
+
+    with pytest.raises(SnapshotError):
+        SnapshotReader(corrupt, verify=True)
+
+    foreign = tmp_path / 'foreign.npxs'
+    foreign.write_bytes(b'not a snapshot' * 10)
+    with pytest.raises(SnapshotError):
+        SnapshotReader(foreign)
+
+    empty = tmp_path / 'empty.npxs'
+    empty.write_bytes(b'')
+    with pytest.raises(SnapshotError):
+        SnapshotReader(empty)
+
+
+def test_json_export_and_import(tmp_path, snapshot_path):
+    json_path = tmp_path / 'tree.json'
+    export_json(snapshot_path, json_path)
+    assert json.loads(json_path.read_text()) == _tree(1000)
+
+    copy_path = tmp_path / 'copy.npxs'
+    import_json(json_path, copy_path)
+    with SnapshotReader(copy_path, verify=True) as reader:
+        assert reader.get_by_name('vm7')['vmid'] == 107
@@ -0,0 +1,213 @@
+"""
+Copyright 2026 The Network Entropologist
+
+https://github.com/NetworkEntropologist
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-License-Identifier: Apache-2.0
+"""
+
+import ipaddress
+import socket
+import statistics
+
+import pynetbox
+import pytest
+import requests
+
+from netbox_proxmox_ingester.standin import (FaultProfile, NetBoxStandin,
+                                             ProxmoxStandin)
+from netbox_proxmox_ingester.standin.common import link_local_ipv6
+
+
+@pytest.fixture
+def netbox():
+    with NetBoxStandin(page_size=50, max_page_size=100) as standin:
+        yield standin
+
+
+def test_netbox_create_filter_and_nested_foreign_keys(netbox):
+    api = pynetbox.api(netbox.url, token='x')
+
+    cluster_type = api.virtualization.cluster_types.create(name='Proxmox',
+                                                           slug='proxmox')
+    cluster = api.virtualization.clusters.create(name='lab', type=cluster_type.id)
+    assert cluster.type.name == 'Proxmox'
+
+    vm = api.virtualization.virtual_machines.create(name='docker01',
+                                                    cluster=cluster.id)
+    assert api.virtualization.virtual_machines.get(name='docker01').id == vm.id
+    assert len(api.virtualization.virtual_machines.filter(cluster_id=cluster.id)) == 1
+
+    # Addresses match on the host, ignoring the mask
+    api.ipam.ip_addresses.create(address='10.0.0.5/24', vrf=None)
+    assert len(api.ipam.ip_addresses.filter(address=['10.0.0.5', '10.0.0.6'])) == 1
+
+    # Proxmox nodes are seeded as devices
+    assert api.dcim.devices.count() >= 1
+
+
+def test_netbox_rejects_missing_fields_and_bad_tokens():
+    with NetBoxStandin(token='secret') as netbox:
+        api = pynetbox.api(netbox.url, token='secret')
+        with pytest.raises(pynetbox.RequestError) as error:
+            api.virtualization.clusters.create(name='lab')
+        assert error.value.req.status_code == 400
+
+        with pytest.raises(pynetbox.RequestError) as error:
+            list(pynetbox.api(netbox.url, token='wrong').dcim.devices.all())
+        assert error.value.req.status_code == 403
+
+
+def test_netbox_pagination_past_max_page_size(netbox):
+    for i in range(250):
+        netbox.add('dcim/mac-addresses', {'mac_address': f'02:00:00:00:{i // 256:02X}:{i % 256:02X}'})
+
+    url = f'{netbox.url}/api/dcim/mac-addresses/?limit=5000'
+    seen = []
+    while url:
+        page = requests.get(url, timeout=5).json()
+        assert len(page['results']) <= netbox.max_page_size
+        seen.extend(record['id'] for record in page['results'])
+        url = page['next']
+
+    assert page['count'] == 250
+    assert len(set(seen)) == 250
+
+    # pynetbox follows the next links on its own
+    api = pynetbox.api(netbox.url, token='x')
+    assert len(list(api.dcim.mac_addresses.all())) == 250
+
+
+def test_rate_limit_returns_429_with_retry_after():
+    profile = FaultProfile(rate_limit=2, rate_window=60, retry_after=3)
+    with NetBoxStandin(fault_profile=profile) as netbox:
+        responses = [requests.get(f'{netbox.url}/api/status/', timeout=5)
+                     for _ in range(3)]
+
+        assert [response.status_code for response in responses] == [200, 200, 429]
+        assert responses[-1].headers['Retry-After'] == '3'
+        assert netbox.stats.get('throttled') == 1
+
+        api = pynetbox.api(netbox.url, token='x')
+        with pytest.raises(pynetbox.RequestError) as error:
+            api.status()
+        assert error.value.req.status_code == 429
+
+
+def test_injected_errors():
+    with NetBoxStandin(fault_profile=FaultProfile(error_rate=1.0,
+                                                  error_status=503)) as netbox:
+        response = requests.get(f'{netbox.url}/api/status/', timeout=5)
+        assert response.status_code == 503
+        assert netbox.stats.get('errors') == 1
+
+
+def test_lognormal_latency_matches_mean_and_jitter():
+    profile = FaultProfile(latency='lognormal', latency_ms=20, jitter_ms=10, seed=1)
+    samples = [profile.sample_latency() * 1000 for _ in range(20000)]
+
+    assert statistics.mean(samples) == pytest.approx(20, rel=0.05)
+    assert statistics.stdev(samples) == pytest.approx(10, rel=0.1)
+
+
+def test_proxmox_tickets_over_plain_http():
+    with ProxmoxStandin(password='pw') as proxmox:
+        base = f'{proxmox.url}/api2/json'
+
+        assert requests.get(f'{base}/nodes', timeout=5).status_code == 401
+        assert requests.post(f'{base}/access/ticket', timeout=5,
+                             data={'username': 'api@pve',
+                                   'password': 'wrong'}).status_code == 401
+
+        login = requests.post(f'{base}/access/ticket', timeout=5,
+                              data={'username': 'api@pve', 'password': 'pw'})
+        ticket = login.json()['data']['ticket']
+        cookies = {'PVEAuthCookie': ticket}
+
+        nodes = requests.get(f'{base}/nodes', cookies=cookies, timeout=5).json()['data']
+        node = nodes[0]['node']
+        vms = requests.get(f'{base}/nodes/{node}/qemu', cookies=cookies,
+                           timeout=5).json()['data']
+        assert len(vms) == len(proxmox.vms)
+
+        # Tickets can be renewed by logging in with the ticket itself
+        renewal = requests.post(f'{base}/access/ticket', timeout=5,
+                                data={'username': 'api@pve', 'password': ticket})
+        assert renewal.status_code == 200
+        assert proxmox.stats.get('logins') == 3
+
+
+def test_clones_have_unique_addresses_within_seeded_prefixes():
+    proxmox = ProxmoxStandin(vm_count=600, node_count=3)
+    netbox = NetBoxStandin(vm_count=600)
+
+    assert len(proxmox.vms) == 600
+    assert len(proxmox.nodes) == 3
+
+    prefixes = [ipaddress.ip_network(record['prefix'])
+                for record in netbox._store['ipam/prefixes'].values()]
+
+    addresses = []
+    for entry in proxmox.vms.values():
+        if 'agent' not in entry['config']:
+            continue
+        mac = entry['config']['net0'].split('=')[1].split(',')[0]
+        nic = next(nic for nic in proxmox._agent_network(entry)['result']
+                   if nic['hardware-address'] == mac.lower())
+        for ip in nic['ip-addresses']:
+            address = ipaddress.ip_interface(f'{ip["ip-address"]}/{ip["prefix"]}')
+            addresses.append(address.ip)
+            if address.version == 4:
+                assert any(address.ip in prefix and address.network == prefix
+                           for prefix in prefixes)
+            else:
+                assert str(address.ip) == link_local_ipv6(mac)
+
+    assert len(addresses) > 100
+    assert len(set(addresses)) == len(addresses)
+
+
+@pytest.mark.filterwarnings('ignore::urllib3.exceptions.InsecureRequestWarning')
+def test_proxmox_standin_with_proxmoxer(tls_files):
+    from proxmoxer import ProxmoxAPI
+
+    certfile, keyfile = tls_files
+    with ProxmoxStandin(vm_count=20, password='pw', certfile=certfile,
+                        keyfile=keyfile) as proxmox:
+        api = ProxmoxAPI(f'127.0.0.1:{proxmox.port}', user='api@pve',
+                         password='pw', verify_ssl=False)
+
+        node = api.nodes.get()[0]['node']
+        vms = api.nodes(node).qemu.get()
+        assert len(vms) == 20
+
+        running = next(vm for vm in vms if vm['status'] == 'running')
+        config = api.nodes(node).qemu(running['vmid']).config.get()
+        assert config['name'] == running['name']
+        assert len(api.cluster.resources.get(type='vm')) == 20
+
+
+@pytest.mark.filterwarnings('ignore::urllib3.exceptions.InsecureRequestWarning')
+def test_idle_tls_client_does_not_block_others(tls_files):
+    certfile, keyfile = tls_files
+    with ProxmoxStandin(password='pw', certfile=certfile,
+                        keyfile=keyfile) as proxmox:
+        # Connect, but never start the TLS handshake
+        with socket.create_connection((proxmox.host, proxmox.port)):
+            response = requests.post(f'{proxmox.url}/api2/json/access/ticket',
+                                     data={'username': 'api@pve', 'password': 'pw'},
+                                     verify=False, timeout=3)
+
+        assert response.status_code == 200